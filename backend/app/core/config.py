@@ -1,12 +1,48 @@
 import logging
 import sys
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import Field, SecretStr, ValidationError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TOWN = "Zielona Góra"
+
+KNOWN_TOWNS = (
+    "Zielona Góra",
+    "Babimost",
+    "Czerwieńsk",
+    "Kargowa",
+    "Nowogród Bobrzański",
+    "Sulechów",
+    "Bojadła",
+    "Świdnica",
+    "Trzebiechów",
+    "Zabór",
+)
+
+ZIELONA_GORA_DISTRICTS = (
+    "Barcikowice",
+    "Drzonków",
+    "Jany",
+    "Jarogniewice",
+    "Jeleniów",
+    "Kiełpin",
+    "Krępa",
+    "Łężyca",
+    "Ługowo",
+    "Marzęcin",
+    "Nowy Kisielin",
+    "Ochla",
+    "Przylep",
+    "Racula",
+    "Stary Kisielin",
+    "Sucha",
+    "Zatonie",
+    "Zawada",
+)
+
 SYSTEM_PROMPT = """You are an AI assistant specialized in extracting and formatting location information from unstructured text messages. Your task is to identify and structure any mentioned towns, districts, streets, and related geographic indicators. Follow these rules:
 
 • Extraction:
@@ -75,6 +111,7 @@ class Settings(BaseSettings):
     COOKIES_PATH: str = Field(..., validation_alias="FB_CREDENTIALS_PATH")
 
     DATABASE_URL: str = Field(..., validation_alias="DATABASE_URL")
+    ASYNC_DATABASE_URL: Optional[str] = Field(default=None)
 
     DEBUG: bool = Field(default=False)
     LOG_LEVEL: str = Field(default="INFO")
@@ -82,6 +119,59 @@ class Settings(BaseSettings):
     GENERAL_LOCATION: str = Field(default="Lubuskie, Poland")
     SYSTEM_PROMPT: str = Field(default=SYSTEM_PROMPT)
 
+    PIPELINE_WORKERS: int = Field(default=4, ge=1)
+    MESSAGE_QUEUE_BACKEND: str = Field(
+        default="database", pattern="^(memory|database)$"
+    )
+    QUEUE_VISIBILITY_TIMEOUT_SECONDS: float = Field(default=300.0, gt=0)
+    QUEUE_MAX_ATTEMPTS: int = Field(default=5, ge=1)
+    QUEUE_RETRY_DELAY_SECONDS: float = Field(default=30.0, ge=0)
+    QUEUE_POLL_SECONDS: float = Field(default=1.0, gt=0)
+    DB_WRITE_BATCH_SIZE: int = Field(default=100, ge=1)
+    DB_WRITE_BATCH_WAIT_MS: float = Field(default=50.0, ge=0)
+
+    LLM_TIMEOUT: float = Field(default=30.0, gt=0)
+    LLM_MAX_RETRIES: int = Field(default=3, ge=0)
+    LLM_MAX_CONCURRENCY: int = Field(default=8, ge=1)
+    LLM_BATCH_SIZE: int = Field(default=1, ge=1)
+    LLM_BATCH_WAIT_MS: float = Field(default=50.0, ge=0)
+
+    PARSE_CACHE_SIZE: int = Field(default=2048, ge=1)
+    PARSE_CACHE_TTL_SECONDS: float = Field(default=24 * 3600, gt=0)
+    NEAR_DUPLICATE_DETECTION: bool = Field(default=False)
+    NEAR_DUPLICATE_THRESHOLD: float = Field(default=0.85, gt=0, le=1)
+
+    FAST_PATH_ENABLED: bool = Field(default=True)
+    FAST_PATH_MIN_CONFIDENCE: float = Field(default=0.8, ge=0, le=1)
+    FAST_PATH_STREETS_PATH: Optional[str] = Field(default=None)
+
+    GEOCODE_CACHE_SIZE: int = Field(default=1024, ge=1)
+    GEOCODE_NEGATIVE_TTL_HOURS: float = Field(default=24.0, ge=0)
+    GAZETTEER_PATH: Optional[str] = Field(default=None)
+    GEOCODE_RATE_LIMIT: float = Field(default=1.0, gt=0)
+    GEOCODE_TIMEOUT: float = Field(default=10.0, gt=0)
+
+    HOT_WINDOW_ENABLED: bool = Field(default=True)
+    HOT_WINDOW_HOURS: int = Field(default=168, ge=1)
+
+    CLUSTER_RADIUS: float = Field(default=60.0, gt=0)
+    CLUSTER_MAX_ZOOM: int = Field(default=16, ge=0, le=22)
+    CLUSTER_CACHE_SIZE: int = Field(default=8, ge=1)
+
+    STREAM_BUFFER_SIZE: int = Field(default=256, ge=1)
+    STREAM_REPLAY_SIZE: int = Field(default=1000, ge=1)
+    STREAM_KEEPALIVE_SECONDS: float = Field(default=15.0, gt=0)
+
+    EXPORT_BATCH_SIZE: int = Field(default=1000, ge=1)
+
+    HEATMAP_PRECISIONS: List[int] = Field(default=[5, 6, 7])
+    HEATMAP_TIMEZONE: str = Field(default="Europe/Warsaw")
+
+    TRACE_BUFFER_SIZE: int = Field(default=50, ge=1)
+    PROFILE_MAX_SECONDS: float = Field(default=60.0, gt=0)
+    PROFILE_INTERVAL_MS: float = Field(default=5.0, gt=0)
+    ADMIN_TOKEN: Optional[SecretStr] = Field(default=None)
+
     API_V1_STR: str = Field(default="/api/v1")
     PROJECT_NAME: str = Field(default="Antiradar API")
     PROJECT_VERSION: str = Field(default="1.0.0")
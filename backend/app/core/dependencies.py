@@ -1,13 +1,81 @@
-from typing import Generator
+from datetime import timedelta
+from typing import AsyncGenerator, Optional, Union
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.db.database import SessionMaker
+from backend.app.core.config import settings
+from backend.app.db.database import AsyncSessionMaker
+from backend.app.services.broadcaster import LocationBroadcaster
+from backend.app.services.change_tracker import ChangeTracker
+from backend.app.services.hot_window import HotWindow
+from backend.app.services.message_queue import (
+    DurableMessageQueue,
+    MemoryMessageQueue,
+)
+from backend.app.services.profiler import LoopProfiler
+from backend.app.services.tracing import TraceBuffer
 
+hot_window = (
+    HotWindow(
+        timedelta(hours=settings.HOT_WINDOW_HOURS),
+        cluster_radius=settings.CLUSTER_RADIUS,
+        cluster_max_zoom=settings.CLUSTER_MAX_ZOOM,
+        cluster_cache_size=settings.CLUSTER_CACHE_SIZE,
+    )
+    if settings.HOT_WINDOW_ENABLED
+    else None
+)
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionMaker()
-    try:
+broadcaster = LocationBroadcaster(
+    buffer_size=settings.STREAM_BUFFER_SIZE,
+    replay_size=settings.STREAM_REPLAY_SIZE,
+)
+
+location_changes = ChangeTracker()
+
+message_queue: Union[DurableMessageQueue, MemoryMessageQueue] = (
+    DurableMessageQueue(
+        AsyncSessionMaker,
+        visibility_timeout=timedelta(
+            seconds=settings.QUEUE_VISIBILITY_TIMEOUT_SECONDS
+        ),
+        max_attempts=settings.QUEUE_MAX_ATTEMPTS,
+        retry_delay=timedelta(seconds=settings.QUEUE_RETRY_DELAY_SECONDS),
+        poll_interval=settings.QUEUE_POLL_SECONDS,
+    )
+    if settings.MESSAGE_QUEUE_BACKEND == "database"
+    else MemoryMessageQueue()
+)
+
+traces = TraceBuffer(settings.TRACE_BUFFER_SIZE)
+
+loop_profiler = LoopProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionMaker() as db:
         yield db
-    finally:
-        db.close()
+
+
+def get_hot_window() -> Optional[HotWindow]:
+    return hot_window
+
+
+def get_broadcaster() -> LocationBroadcaster:
+    return broadcaster
+
+
+def get_location_changes() -> ChangeTracker:
+    return location_changes
+
+
+def get_message_queue() -> Union[DurableMessageQueue, MemoryMessageQueue]:
+    return message_queue
+
+
+def get_traces() -> TraceBuffer:
+    return traces
+
+
+def get_loop_profiler() -> LoopProfiler:
+    return loop_profiler
@@ -0,0 +1,281 @@
+import asyncio
+import bisect
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple, Union
+
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+
+LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'),
+        )
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labels)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[Tuple[str, LabelValues, float]]:
+        return iter(())
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, (names, values), value in self.samples():
+            lines.append(
+                f"{self.name}{suffix}{format_labels(names, values)} "
+                f"{format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in list(self._values.items()):
+            yield "_total", (self.labelnames, key), value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels=(),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._values.get(key)
+        if counts is None:
+            counts = self._values.setdefault(
+                key, [0] * (len(self.buckets) + 1) + [0.0]
+            )
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        names = self.labelnames + ("le",)
+        for key, counts in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                bound = "+Inf" if math.isinf(bound) else format_value(bound)
+                yield "_bucket", (names, key + (bound,)), cumulative
+            yield "_sum", (self.labelnames, key), counts[-1]
+            yield "_count", (self.labelnames, key), cumulative
+
+
+class Callback(Metric):
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], Union[float, Dict[LabelValues, float]]],
+        labels=(),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, documentation, labels)
+        self.kind = kind
+        self.callback = callback
+
+    def samples(self):
+        suffix = "_total" if self.kind == "counter" else ""
+        values = self.callback()
+        if not isinstance(values, dict):
+            values = {(): values}
+        for key, value in values.items():
+            yield suffix, (self.labelnames, key), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels=()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels=(),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable,
+        labels=(),
+        kind: str = "gauge",
+    ) -> Callback:
+        return self.register(
+            Callback(name, documentation, callback, labels, kind)
+        )
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+QUEUE_WAIT_SECONDS = registry.histogram(
+    "antiradar_queue_wait_seconds",
+    "Time messages spend in the message queue before a worker takes them",
+)
+LLM_PARSE_SECONDS = registry.histogram(
+    "antiradar_llm_parse_seconds",
+    "Latency of chat completion calls, including retries",
+    labels=("kind",),
+)
+GEOCODE_SECONDS = registry.histogram(
+    "antiradar_geocode_seconds",
+    "Latency of resolving an address to coordinates",
+    labels=("source",),
+)
+DB_WRITE_SECONDS = registry.histogram(
+    "antiradar_db_write_seconds",
+    "Latency of location inserts",
+    labels=("mode",),
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "antiradar_http_request_seconds",
+    "HTTP request latency per route",
+    labels=("method", "route", "status"),
+)
+
+MESSAGES = registry.counter(
+    "antiradar_messages",
+    "Messages taken off the queue, by outcome",
+    labels=("outcome",),
+)
+LLM_TOKENS = registry.counter(
+    "antiradar_llm_tokens",
+    "Tokens reported by the chat completion API",
+    labels=("type",),
+)
+
+
+def hit_ratio(hits: float, total: float) -> float:
+    return hits / total if total else 0.0
+
+
+class TimedQueue(asyncio.Queue):
+    def _put(self, item) -> None:
+        super()._put((time.monotonic(), item))
+
+    def _get(self):
+        enqueued_at, item = super()._get()
+        QUEUE_WAIT_SECONDS.observe(time.monotonic() - enqueued_at)
+        return item
+
+
+class TimedRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except RequestValidationError:
+                status = 422
+                raise
+            except Exception as e:
+                status = getattr(e, "status_code", 500)
+                raise
+            finally:
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    method=request.method,
+                    route=self.path_format,
+                    status=str(status),
+                )
+
+        return timed_handler
@@ -1,9 +1,19 @@
-from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+GEOHASH_PRECISION = 9
+
 
 class Location(Base):
     __tablename__ = "locations"
@@ -15,3 +25,60 @@ class Location(Base):
     long = Column(Float)
     message = Column(String)
     post_time = Column(DateTime(timezone=True), server_default=func.now())
+    geohash = Column(String(GEOHASH_PRECISION), index=True)
+    town_key = Column(String)
+
+    __table_args__ = (
+        Index("ix_locations_post_time_id", "post_time", "id"),
+        Index(
+            "ix_locations_town_key",
+            "town_key",
+            postgresql_ops={"town_key": "text_pattern_ops"},
+        ),
+    )
+
+
+class GeocodeCacheEntry(Base):
+    __tablename__ = "geocode_cache"
+
+    key = Column(String, primary_key=True)
+    lat = Column(Float, nullable=True)
+    long = Column(Float, nullable=True)
+    cached_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class HeatmapBucket(Base):
+    __tablename__ = "heatmap_buckets"
+
+    precision = Column(Integer, primary_key=True)
+    cell = Column(String(GEOHASH_PRECISION), primary_key=True)
+    weekday = Column(Integer, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class QueuedMessage(Base):
+    __tablename__ = "message_queue"
+
+    id = Column(Integer, primary_key=True)
+    trace_id = Column(String(32))
+    message = Column(String)
+    status = Column(String(16), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    enqueued_at = Column(DateTime(timezone=True), nullable=False)
+    available_at = Column(DateTime(timezone=True), nullable=False)
+    last_error = Column(String)
+
+    __table_args__ = (
+        Index(
+            "ix_message_queue_status_available_at", "status", "available_at"
+        ),
+    )
+
+
+class ChangeVersion(Base):
+    __tablename__ = "change_versions"
+
+    scope = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
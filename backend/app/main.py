@@ -3,9 +3,14 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 
+from backend.app.routers.admin import router as admin_router
 from backend.app.routers.locations import router as locations_router
 from backend.app.core.logging import setup_logging
+from backend.app.core.dependencies import hot_window
+from backend.app.core.metrics import registry
+from backend.app.db.database import AsyncSessionMaker, async_engine
 from backend.app.services.async_runner import main
 
 logger = setup_logging()
@@ -14,6 +19,12 @@ logger = setup_logging()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # init_db()
+    if hot_window is not None:
+        try:
+            await hot_window.warm(AsyncSessionMaker)
+        except Exception as e:
+            logger.error("Failed to warm hot window, serving from DB: %s", e)
+
     main_task = asyncio.create_task(main())
 
     logger.info("Application initialized, database ready")
@@ -29,12 +40,15 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         logger.info("Main task was cancelled")
 
+    await async_engine.dispose()
+
     logger.info("Application shutdown complete")
 
 
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(locations_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -45,3 +59,10 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,63 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Row, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.models.models import ChangeVersion
+from backend.app.repositories.heatmap import UPSERT_DIALECTS
+
+logger = logging.getLogger(__name__)
+
+LOCATIONS = "locations"
+
+
+def bump_version(scope: str):
+    return (
+        update(ChangeVersion)
+        .where(ChangeVersion.scope == scope)
+        .values(
+            version=ChangeVersion.version + 1,
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+class ChangeVersionRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get(self, scope: str) -> Optional[Row]:
+        try:
+            result = await self.db.execute(
+                select(ChangeVersion.version, ChangeVersion.updated_at).where(
+                    ChangeVersion.scope == scope
+                )
+            )
+            return result.first()
+        except SQLAlchemyError as e:
+            logger.error("Database error reading %s version: %s", scope, e)
+            await self.db.rollback()
+            raise
+
+    async def ensure(self, scope: str) -> None:
+        connection = await self.db.connection()
+        upsert = UPSERT_DIALECTS[connection.dialect.name]
+        try:
+            await self.db.execute(
+                upsert(ChangeVersion)
+                .values(
+                    scope=scope,
+                    version=0,
+                    updated_at=datetime.now(timezone.utc),
+                )
+                .on_conflict_do_nothing(index_elements=[ChangeVersion.scope])
+            )
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            logger.error("Database error creating %s version: %s", scope, e)
+            await self.db.rollback()
+            raise
@@ -0,0 +1,120 @@
+import logging
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Row, and_, delete, func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.models.models import HeatmapBucket
+from backend.utils import geohash
+
+logger = logging.getLogger(__name__)
+
+BucketKey = Tuple[int, str, int, int]
+
+UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def bucket_keys(
+    lat: Optional[float],
+    long: Optional[float],
+    post_time: Optional[datetime],
+    precisions: Iterable[int],
+    timezone: ZoneInfo,
+) -> List[BucketKey]:
+    if lat is None or long is None or post_time is None:
+        return []
+
+    if post_time.tzinfo is None:
+        post_time = post_time.replace(tzinfo=dt_timezone.utc)
+    local_time = post_time.astimezone(timezone)
+    cell = geohash.encode(lat, long, max(precisions))
+    return [
+        (precision, cell[:precision], local_time.weekday(), local_time.hour)
+        for precision in precisions
+    ]
+
+
+def increment_buckets(dialect: str):
+    statement = UPSERT_DIALECTS[dialect](HeatmapBucket)
+    return statement.on_conflict_do_update(
+        index_elements=[
+            HeatmapBucket.precision,
+            HeatmapBucket.cell,
+            HeatmapBucket.weekday,
+            HeatmapBucket.hour,
+        ],
+        set_={"count": HeatmapBucket.count + statement.excluded.count},
+    )
+
+
+def bucket_rows(counts: Dict[BucketKey, int]) -> List[Dict]:
+    return [
+        {
+            "precision": precision,
+            "cell": cell,
+            "weekday": weekday,
+            "hour": hour,
+            "count": count,
+        }
+        for (precision, cell, weekday, hour), count in sorted(counts.items())
+    ]
+
+
+def prune_buckets():
+    return delete(HeatmapBucket).where(HeatmapBucket.count <= 0)
+
+
+class HeatmapRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_cells(
+        self,
+        precision: int,
+        weekdays: Optional[Sequence[int]] = None,
+        hours: Optional[Sequence[int]] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        try:
+            total = func.sum(HeatmapBucket.count).label("count")
+            query = select(HeatmapBucket.cell, total).filter(
+                HeatmapBucket.precision == precision
+            )
+            if weekdays:
+                query = query.filter(HeatmapBucket.weekday.in_(weekdays))
+            if hours:
+                query = query.filter(HeatmapBucket.hour.in_(hours))
+            if bbox is not None:
+                ranges = []
+                for cell in geohash.covering_cells(*bbox):
+                    lower, upper = geohash.prefix_range(cell[:precision])
+                    ranges.append(
+                        and_(
+                            HeatmapBucket.cell >= lower,
+                            HeatmapBucket.cell < upper,
+                        )
+                        if upper
+                        else HeatmapBucket.cell >= lower
+                    )
+                if ranges:
+                    query = query.filter(or_(*ranges))
+
+            query = query.group_by(HeatmapBucket.cell).order_by(total.desc())
+            if limit is not None:
+                query = query.limit(limit)
+
+            result = await self.db.execute(query)
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching heatmap cells: %s", e)
+            raise
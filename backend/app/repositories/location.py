@@ -1,61 +1,198 @@
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
 
+from sqlalchemy import Row, and_, func, insert, or_, select, tuple_
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.db.models.models import Location
-from backend.app.schemas.location import LocationCreate, LocationUpdate
+from backend.app.core.config import settings
+from backend.app.db.models.models import GEOHASH_PRECISION, Location
+from backend.app.repositories.change_version import LOCATIONS, bump_version
+from backend.app.repositories.heatmap import (
+    bucket_keys,
+    bucket_rows,
+    increment_buckets,
+    prune_buckets,
+)
+from backend.app.schemas.location import (
+    LocationCreate,
+    LocationImport,
+    LocationResponse,
+    LocationUpdate,
+)
+from backend.utils import geohash
+from backend.utils.text import fold_diacritics, normalize_text
 
 logger = logging.getLogger(__name__)
 
+LOCATION_COLUMNS = tuple(
+    getattr(Location, name) for name in LocationResponse.model_fields
+)
+
+HEATMAP_TIMEZONE = ZoneInfo(settings.HEATMAP_TIMEZONE)
+
+
+def location_geohash(lat: Optional[float], long: Optional[float]):
+    if lat is None or long is None:
+        return None
+    return geohash.encode(lat, long, GEOHASH_PRECISION)
+
+
+def location_town_key(town: Optional[str]):
+    if town is None:
+        return None
+    return fold_diacritics(normalize_text(town))
+
+
+def location_row(location_data: LocationCreate) -> dict:
+    row = location_data.model_dump()
+    # Always stamp post_time here rather than relying on the server default:
+    # SQLite stores func.now() without microseconds, which would not compare
+    # consistently with the bound (post_time, id) cursor in get_page.
+    post_time = row.get("post_time") or datetime.now(timezone.utc)
+    if post_time.tzinfo is None:
+        post_time = post_time.replace(tzinfo=timezone.utc)
+    row["post_time"] = post_time
+    row["geohash"] = location_geohash(row["lat"], row["long"])
+    row["town_key"] = location_town_key(row["town"])
+    return row
+
+
+def heatmap_counts(
+    points: Iterable[Tuple[Optional[float], Optional[float], datetime]],
+) -> Counter:
+    counts = Counter()
+    for lat, long, post_time in points:
+        counts.update(
+            bucket_keys(
+                lat,
+                long,
+                post_time,
+                settings.HEATMAP_PRECISIONS,
+                HEATMAP_TIMEZONE,
+            )
+        )
+    return counts
+
+
+def row_points(rows: Iterable[dict]):
+    return ((row["lat"], row["long"], row["post_time"]) for row in rows)
+
+
+def location_point(location: Location):
+    return location.lat, location.long, location.post_time
+
+
+def town_filter(town: str, match: str = "fuzzy"):
+    key = location_town_key(town)
+    if match == "exact":
+        return Location.town_key == key
+    if match == "prefix":
+        return Location.town_key.startswith(key, autoescape=True)
+    if match == "fuzzy":
+        return Location.town_key.contains(key, autoescape=True)
+    raise ValueError(f"Unknown town match mode '{match}'")
+
 
 class LocationRepository:
 
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_by_id(self, location_id: int) -> Optional[Location]:
+    async def _update_heatmap(self, counts: Counter) -> None:
+        counts = {key: count for key, count in counts.items() if count}
+        if not counts:
+            return
+
+        connection = await self.db.connection()
+        await self.db.execute(
+            increment_buckets(connection.dialect.name), bucket_rows(counts)
+        )
+        if any(count < 0 for count in counts.values()):
+            await self.db.execute(prune_buckets())
+
+    async def get_by_id(self, location_id: int) -> Optional[Location]:
         try:
-            return (
-                self.db.query(Location)
-                .filter(Location.id == location_id)
-                .first()
-            )
+            return await self.db.get(Location, location_id)
         except SQLAlchemyError as e:
             logger.error(
                 "Database error getting location by ID %s: %s", location_id, e
             )
             raise
 
-    def get_by_town(
-        self, town: str, skip: int = 0, limit: int = 100
-    ) -> List[Location]:
+    async def get_by_town(
+        self, town: str, skip: int = 0, limit: int = 100, match: str = "fuzzy"
+    ) -> List[Row]:
         try:
-            return (
-                self.db.query(Location)
-                .filter(Location.town.ilike(f"%{town}%"))
-                .order_by(Location.post_time.desc())
+            result = await self.db.execute(
+                select(*LOCATION_COLUMNS)
+                .filter(town_filter(town, match))
+                .order_by(Location.post_time.desc(), Location.id.desc())
                 .offset(skip)
                 .limit(limit)
-                .all()
             )
+            return result.all()
         except SQLAlchemyError as e:
             logger.error(
                 "Database error fetching locations by town %s: %s", town, e
             )
             raise
 
-    def get_in_last_hours(self, hours: int) -> List[Location]:
+    async def get_page(
+        self,
+        after: Optional[Tuple[datetime, int]] = None,
+        limit: int = 100,
+        town: Optional[str] = None,
+        match: str = "fuzzy",
+    ) -> List[Row]:
+        try:
+            query = select(*LOCATION_COLUMNS)
+            if town:
+                query = query.filter(town_filter(town, match))
+            if after is not None:
+                query = query.filter(
+                    tuple_(Location.post_time, Location.id) < tuple_(*after)
+                )
+
+            result = await self.db.execute(
+                query.order_by(
+                    Location.post_time.desc(), Location.id.desc()
+                ).limit(limit)
+            )
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching location page: %s", e)
+            raise
+
+    async def get_after_id(self, last_id: int, limit: int = 1000) -> List[Row]:
+        try:
+            result = await self.db.execute(
+                select(*LOCATION_COLUMNS)
+                .filter(Location.id > last_id)
+                .order_by(Location.id)
+                .limit(limit)
+            )
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error(
+                "Database error fetching locations after ID %s: %s",
+                last_id,
+                e,
+            )
+            raise
+
+    async def get_in_last_hours(self, hours: int) -> List[Row]:
         try:
             cutoff_time = datetime.now() - timedelta(hours=hours)
-            locations = (
-                self.db.query(Location)
+            result = await self.db.execute(
+                select(*LOCATION_COLUMNS)
                 .filter(Location.post_time >= cutoff_time)
                 .order_by(Location.post_time.desc())
-                .all()
             )
+            locations = result.all()
             logger.info(
                 "Successfully fetched %d locations in the last %d hours.",
                 len(locations),
@@ -70,14 +207,14 @@ class LocationRepository:
             )
             raise
 
-    def get_since_datetime(self, since: datetime) -> List[Location]:
+    async def get_since_datetime(self, since: datetime) -> List[Row]:
         try:
-            locations = (
-                self.db.query(Location)
+            result = await self.db.execute(
+                select(*LOCATION_COLUMNS)
                 .filter(Location.post_time >= since)
                 .order_by(Location.post_time.desc())
-                .all()
             )
+            locations = result.all()
             logger.info(
                 "Successfully fetched %d locations since %s.",
                 len(locations),
@@ -90,18 +227,114 @@ class LocationRepository:
             )
             raise
 
-    def create(self, location_data: LocationCreate) -> Location:
+    async def stream_between(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        query = select(*LOCATION_COLUMNS).filter(Location.post_time >= since)
+        if until is not None:
+            query = query.filter(Location.post_time < until)
+
+        try:
+            result = await self.db.stream(
+                query.order_by(
+                    Location.post_time, Location.id
+                ).execution_options(yield_per=batch_size)
+            )
+            async for rows in result.partitions():
+                yield rows
+        except SQLAlchemyError as e:
+            logger.error(
+                "Database error streaming locations since %s: %s", since, e
+            )
+            raise
+
+    async def get_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        try:
+            query = select(*LOCATION_COLUMNS).filter(
+                Location.lat.between(min_lat, max_lat),
+                Location.long.between(min_lon, max_lon),
+            )
+
+            cells = geohash.covering_cells(min_lat, min_lon, max_lat, max_lon)
+            if cells:
+                ranges = []
+                for cell in cells:
+                    lower, upper = geohash.prefix_range(cell)
+                    ranges.append(
+                        and_(
+                            Location.geohash >= lower, Location.geohash < upper
+                        )
+                        if upper
+                        else Location.geohash >= lower
+                    )
+                query = query.filter(or_(*ranges))
+
+            if since is not None:
+                query = query.filter(Location.post_time >= since)
+
+            query = query.order_by(Location.post_time.desc())
+            if limit is not None:
+                query = query.limit(limit)
+
+            locations = (await self.db.execute(query)).all()
+            logger.info(
+                "Successfully fetched %d locations in bbox (%s, %s, %s, %s).",
+                len(locations),
+                min_lat,
+                min_lon,
+                max_lat,
+                max_lon,
+            )
+            return locations
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching locations in bbox: %s", e)
+            raise
+
+    async def get_near(
+        self,
+        lat: float,
+        lon: float,
+        radius_m: float,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        candidates = await self.get_in_bbox(
+            *geohash.radius_bbox(lat, lon, radius_m), since=since
+        )
+        locations = [
+            location
+            for location in candidates
+            if geohash.haversine_m(lat, lon, location.lat, location.long)
+            <= radius_m
+        ]
+        return locations[:limit] if limit is not None else locations
+
+    async def create(self, location_data: LocationCreate) -> Location:
         try:
-            db_location = Location(**location_data.model_dump())
             logger.info(
                 "Attempting to add location to DB: Town=%s, Street=%s",
-                db_location.town,
-                db_location.street,
+                location_data.town,
+                location_data.street,
             )
 
-            self.db.add(db_location)
-            self.db.commit()
-            self.db.refresh(db_location)
+            row = location_row(location_data)
+            db_location = await self.db.scalar(
+                insert(Location).returning(Location), [row]
+            )
+            await self._update_heatmap(heatmap_counts(row_points([row])))
+            await self.db.execute(bump_version(LOCATIONS))
+            await self.db.commit()
 
             logger.info(
                 "Successfully added location with ID: %s", db_location.id
@@ -109,23 +342,93 @@ class LocationRepository:
             return db_location
         except SQLAlchemyError as e:
             logger.error("Database error adding location: %s", e)
-            self.db.rollback()
+            await self.db.rollback()
+            raise
+
+    async def create_many(
+        self, locations_data: List[LocationCreate]
+    ) -> List[Location]:
+        try:
+            rows = [location_row(location) for location in locations_data]
+            result = await self.db.scalars(
+                insert(Location).returning(
+                    Location, sort_by_parameter_order=True
+                ),
+                rows,
+            )
+            db_locations = list(result)
+            await self._update_heatmap(heatmap_counts(row_points(rows)))
+            await self.db.execute(bump_version(LOCATIONS))
+            await self.db.commit()
+
+            logger.info(
+                "Successfully added %d locations in one batch",
+                len(db_locations),
+            )
+            return db_locations
+        except SQLAlchemyError as e:
+            logger.error("Database error adding location batch: %s", e)
+            await self.db.rollback()
+            raise
+
+    async def copy_many(self, locations_data: List[LocationImport]) -> int:
+        connection = await self.db.connection()
+        if connection.dialect.driver != "asyncpg":
+            return len(await self.create_many(locations_data))
+
+        try:
+            raw_connection = await connection.get_raw_connection()
+            columns = [*LocationImport.model_fields, "geohash", "town_key"]
+            rows = [
+                location_row(LocationImport(**location.model_dump()))
+                for location in locations_data
+            ]
+            await raw_connection.driver_connection.copy_records_to_table(
+                Location.__tablename__,
+                records=[
+                    tuple(row[column] for column in columns) for row in rows
+                ],
+                columns=columns,
+            )
+            await self._update_heatmap(heatmap_counts(row_points(rows)))
+            await self.db.execute(bump_version(LOCATIONS))
+            await self.db.commit()
+
+            logger.info(
+                "Successfully copied %d locations", len(locations_data)
+            )
+            return len(locations_data)
+        except Exception as e:
+            logger.error("Database error copying locations: %s", e)
+            await self.db.rollback()
             raise
 
-    def update(
+    async def update(
         self, location_id: int, location_data: LocationUpdate
     ) -> Optional[Location]:
         try:
-            db_location = self.get_by_id(location_id)
+            db_location = await self.get_by_id(location_id)
             if not db_location:
                 return None
 
+            counts = Counter()
+            counts.subtract(heatmap_counts([location_point(db_location)]))
+
             update_data = location_data.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(db_location, field, value)
+            if "lat" in update_data or "long" in update_data:
+                db_location.geohash = location_geohash(
+                    db_location.lat, db_location.long
+                )
+            if "town" in update_data:
+                db_location.town_key = location_town_key(db_location.town)
 
-            self.db.commit()
-            self.db.refresh(db_location)
+            counts.update(heatmap_counts([location_point(db_location)]))
+            await self._update_heatmap(counts)
+            await self.db.execute(bump_version(LOCATIONS))
+            await self.db.commit()
+            await self.db.refresh(db_location)
             logger.info(
                 "Successfully updated location with ID: %s", location_id
             )
@@ -134,17 +437,22 @@ class LocationRepository:
             logger.error(
                 "Database error updating location %s: %s", location_id, e
             )
-            self.db.rollback()
+            await self.db.rollback()
             raise
 
-    def delete(self, location_id: int) -> bool:
+    async def delete(self, location_id: int) -> bool:
         try:
-            db_location = self.get_by_id(location_id)
+            db_location = await self.get_by_id(location_id)
             if not db_location:
                 return False
 
-            self.db.delete(db_location)
-            self.db.commit()
+            counts = Counter()
+            counts.subtract(heatmap_counts([location_point(db_location)]))
+
+            await self.db.delete(db_location)
+            await self._update_heatmap(counts)
+            await self.db.execute(bump_version(LOCATIONS))
+            await self.db.commit()
             logger.info(
                 "Successfully deleted location with ID: %s", location_id
             )
@@ -153,25 +461,27 @@ class LocationRepository:
             logger.error(
                 "Database error deleting location %s: %s", location_id, e
             )
-            self.db.rollback()
+            await self.db.rollback()
             raise
 
-    def count(self) -> int:
+    async def count(self) -> int:
         try:
-            return self.db.query(Location).count()
+            return await self.db.scalar(
+                select(func.count()).select_from(Location)
+            )
         except SQLAlchemyError as e:
             logger.error("Database error counting locations: %s", e)
             raise
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Location]:
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Row]:
         try:
-            return (
-                self.db.query(Location)
-                .order_by(Location.post_time.desc())
+            result = await self.db.execute(
+                select(*LOCATION_COLUMNS)
+                .order_by(Location.post_time.desc(), Location.id.desc())
                 .offset(skip)
                 .limit(limit)
-                .all()
             )
+            return result.all()
         except SQLAlchemyError as e:
             logger.error("Database error fetching all locations: %s", e)
             raise
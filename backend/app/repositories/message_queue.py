@@ -0,0 +1,213 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row, delete, func, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.models.models import QueuedMessage
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+PROCESSING = "processing"
+DEAD = "dead"
+
+DELIVERY_COLUMNS = (
+    QueuedMessage.id,
+    QueuedMessage.trace_id,
+    QueuedMessage.message,
+    QueuedMessage.attempts,
+    QueuedMessage.enqueued_at,
+)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class MessageQueueRepository:
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(self, message: str, trace_id: Optional[str]) -> int:
+        now = utcnow()
+        queued = QueuedMessage(
+            trace_id=trace_id,
+            message=message,
+            status=PENDING,
+            attempts=0,
+            enqueued_at=now,
+            available_at=now,
+        )
+        try:
+            self.db.add(queued)
+            await self.db.commit()
+            return queued.id
+        except SQLAlchemyError as e:
+            logger.error("Database error enqueueing message: %s", e)
+            await self.db.rollback()
+            raise
+
+    async def claim(
+        self, visibility_timeout: timedelta, max_attempts: int, limit: int = 1
+    ) -> List[Row]:
+        now = utcnow()
+        expired = (
+            update(QueuedMessage)
+            .where(
+                QueuedMessage.status == PROCESSING,
+                QueuedMessage.available_at <= now,
+                QueuedMessage.attempts >= max_attempts,
+            )
+            .values(status=DEAD, last_error="Visibility timeout expired")
+        )
+        candidates = (
+            select(QueuedMessage.id)
+            .where(
+                QueuedMessage.status.in_((PENDING, PROCESSING)),
+                QueuedMessage.available_at <= now,
+            )
+            .order_by(QueuedMessage.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(QueuedMessage)
+            .where(QueuedMessage.id.in_(candidates.scalar_subquery()))
+            .values(
+                status=PROCESSING,
+                attempts=QueuedMessage.attempts + 1,
+                available_at=now + visibility_timeout,
+            )
+            .returning(*DELIVERY_COLUMNS)
+        )
+
+        try:
+            await self.db.execute(expired)
+            result = await self.db.execute(claim)
+            rows = sorted(result.all(), key=lambda row: row.id)
+            await self.db.commit()
+            return rows
+        except SQLAlchemyError as e:
+            logger.error("Database error claiming messages: %s", e)
+            await self.db.rollback()
+            raise
+
+    async def ack(self, message_id: int, attempt: int) -> bool:
+        try:
+            result = await self.db.execute(
+                delete(QueuedMessage).where(
+                    QueuedMessage.id == message_id,
+                    QueuedMessage.status == PROCESSING,
+                    QueuedMessage.attempts == attempt,
+                )
+            )
+            await self.db.commit()
+            return bool(result.rowcount)
+        except SQLAlchemyError as e:
+            logger.error("Database error acking message %d: %s", message_id, e)
+            await self.db.rollback()
+            raise
+
+    async def extend(
+        self, claims: Sequence[Tuple[int, int]], visibility_timeout: timedelta
+    ) -> int:
+        try:
+            result = await self.db.execute(
+                update(QueuedMessage)
+                .where(
+                    QueuedMessage.status == PROCESSING,
+                    tuple_(QueuedMessage.id, QueuedMessage.attempts).in_(
+                        claims
+                    ),
+                )
+                .values(available_at=utcnow() + visibility_timeout)
+            )
+            await self.db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            logger.error("Database error extending message claims: %s", e)
+            await self.db.rollback()
+            raise
+
+    async def fail(
+        self,
+        message_id: int,
+        attempt: int,
+        error: str,
+        max_attempts: int,
+        retry_delay: timedelta,
+    ) -> Optional[str]:
+        status = DEAD if attempt >= max_attempts else PENDING
+        try:
+            result = await self.db.execute(
+                update(QueuedMessage)
+                .where(
+                    QueuedMessage.id == message_id,
+                    QueuedMessage.status == PROCESSING,
+                    QueuedMessage.attempts == attempt,
+                )
+                .values(
+                    status=status,
+                    available_at=utcnow() + retry_delay * 2 ** (attempt - 1),
+                    last_error=error,
+                )
+            )
+            await self.db.commit()
+            return status if result.rowcount else None
+        except SQLAlchemyError as e:
+            logger.error(
+                "Database error failing message %d: %s", message_id, e
+            )
+            await self.db.rollback()
+            raise
+
+    async def counts(self) -> Dict[str, int]:
+        try:
+            result = await self.db.execute(
+                select(QueuedMessage.status, func.count()).group_by(
+                    QueuedMessage.status
+                )
+            )
+            return {status: count for status, count in result.all()}
+        except SQLAlchemyError as e:
+            logger.error("Database error counting queued messages: %s", e)
+            raise
+
+    async def get_dead(self, limit: int = 100) -> List[Row]:
+        try:
+            result = await self.db.execute(
+                select(
+                    *DELIVERY_COLUMNS,
+                    QueuedMessage.available_at,
+                    QueuedMessage.last_error,
+                )
+                .where(QueuedMessage.status == DEAD)
+                .order_by(QueuedMessage.id.desc())
+                .limit(limit)
+            )
+            return result.all()
+        except SQLAlchemyError as e:
+            logger.error("Database error fetching dead letters: %s", e)
+            raise
+
+    async def retry_dead(
+        self, message_ids: Optional[Sequence[int]] = None
+    ) -> int:
+        query = update(QueuedMessage).where(QueuedMessage.status == DEAD)
+        if message_ids is not None:
+            query = query.where(QueuedMessage.id.in_(message_ids))
+
+        try:
+            result = await self.db.execute(
+                query.values(status=PENDING, attempts=0, available_at=utcnow())
+            )
+            await self.db.commit()
+            return result.rowcount
+        except SQLAlchemyError as e:
+            logger.error("Database error requeueing dead letters: %s", e)
+            await self.db.rollback()
+            raise
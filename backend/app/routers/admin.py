@@ -0,0 +1,158 @@
+import hmac
+import logging
+from typing import List, Optional, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from backend.app.core.config import settings
+from backend.app.core.dependencies import (
+    get_loop_profiler,
+    get_message_queue,
+    get_traces,
+)
+from backend.app.services.message_queue import (
+    DurableMessageQueue,
+    MemoryMessageQueue,
+)
+from backend.app.services.profiler import LoopProfiler
+from backend.app.services.tracing import TraceBuffer
+
+logger = logging.getLogger(__name__)
+
+MessageQueue = Union[DurableMessageQueue, MemoryMessageQueue]
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    token = settings.ADMIN_TOKEN
+    if token is None or not token.get_secret_value():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token, token.get_secret_value()
+    ):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.get("/traces")
+async def get_traces_summary(
+    order: str = Query(
+        "slowest", pattern="^(slowest|recent)$", description="Trace order"
+    ),
+    limit: int = Query(20, ge=1, le=1000),
+    traces: TraceBuffer = Depends(get_traces),
+):
+    selected = (
+        traces.slowest(limit) if order == "slowest" else traces.recent(limit)
+    )
+    return {
+        "recorded": traces.recorded,
+        "size": traces.size,
+        "traces": [trace.as_dict() for trace in selected],
+    }
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, traces: TraceBuffer = Depends(get_traces)):
+    trace = traces.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.as_dict()
+
+
+@router.delete("/traces", status_code=204)
+async def clear_traces(traces: TraceBuffer = Depends(get_traces)):
+    traces.clear()
+
+
+def durable_queue(
+    message_queue: MessageQueue = Depends(get_message_queue),
+) -> DurableMessageQueue:
+    if not isinstance(message_queue, DurableMessageQueue):
+        raise HTTPException(
+            status_code=404,
+            detail="Dead letters need MESSAGE_QUEUE_BACKEND=database",
+        )
+    return message_queue
+
+
+@router.get("/queue")
+async def get_queue_stats(
+    message_queue: MessageQueue = Depends(get_message_queue),
+):
+    if not isinstance(message_queue, DurableMessageQueue):
+        return {"backend": "memory", "pending": message_queue.qsize()}
+    try:
+        return {"backend": "database", **await message_queue.stats()}
+    except Exception as e:
+        logger.error("API error fetching queue stats: %s", e)
+        raise HTTPException(
+            status_code=500, detail="Internal Server Error reading queue"
+        )
+
+
+@router.get("/queue/dead")
+async def get_dead_letters(
+    limit: int = Query(100, ge=1, le=1000),
+    message_queue: DurableMessageQueue = Depends(durable_queue),
+):
+    try:
+        return await message_queue.dead_letters(limit)
+    except Exception as e:
+        logger.error("API error fetching dead letters: %s", e)
+        raise HTTPException(
+            status_code=500, detail="Internal Server Error reading queue"
+        )
+
+
+@router.post("/queue/dead/retry")
+async def retry_dead_letters(
+    message_id: Optional[List[int]] = Query(
+        None, description="Dead letters to requeue (default: all)"
+    ),
+    message_queue: DurableMessageQueue = Depends(durable_queue),
+):
+    try:
+        requeued = await message_queue.retry_dead(message_id)
+    except Exception as e:
+        logger.error("API error requeueing dead letters: %s", e)
+        raise HTTPException(
+            status_code=500, detail="Internal Server Error updating queue"
+        )
+    logger.info("Requeued %d dead letters", requeued)
+    return {"requeued": requeued}
+
+
+@router.post("/profile")
+async def profile_event_loop(
+    seconds: float = Query(
+        10, gt=0, le=settings.PROFILE_MAX_SECONDS, description="Duration"
+    ),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+    output: str = Query(
+        "json",
+        pattern="^(json|collapsed)$",
+        description="json summary or collapsed stacks for flame graphs",
+    ),
+    limit: int = Query(25, ge=1, le=500),
+    profiler: LoopProfiler = Depends(get_loop_profiler),
+):
+    if profiler.running:
+        raise HTTPException(
+            status_code=409, detail="A profile is already running"
+        )
+
+    logger.info("Profiling event loop for %.1fs", seconds)
+    result = await profiler.profile(
+        seconds, interval_ms / 1000 if interval_ms else None
+    )
+
+    if output == "collapsed":
+        return PlainTextResponse(result.collapsed())
+    return result.as_dict(limit)
@@ -1,51 +1,208 @@
+import asyncio
 import logging
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.core.dependencies import get_db
+from backend.app.core.config import settings
+from backend.app.core.dependencies import (
+    get_broadcaster,
+    get_db,
+    get_hot_window,
+    get_location_changes,
+)
+from backend.app.core.metrics import TimedRoute
+from backend.app.db.database import AsyncSessionMaker
+from backend.app.schemas.cluster import LocationCluster
+from backend.app.schemas.heatmap import HeatmapCell
 from backend.app.schemas.location import (
     LocationCreate,
     LocationResponse,
     LocationUpdate,
 )
+from backend.app.services.broadcaster import (
+    LocationBroadcaster,
+    Subscription,
+)
+from backend.app.services.change_tracker import (
+    ChangeTracker,
+    http_date,
+    is_not_modified,
+)
+from backend.app.services.heatmap import HeatmapService
+from backend.app.services.hot_window import HotWindow
+from backend.app.services.location_formats import (
+    EXPORT_EXTENSIONS,
+    EXPORT_MEDIA_TYPES,
+    LOCATION_FIELDS,
+    LocationRecord,
+    OutputFormat,
+    export_chunk,
+    export_header,
+    negotiate_format,
+    parse_fields,
+    render_locations,
+)
 from backend.app.services.location_service import LocationService
-from backend.utils.converter import string_to_datetime
+from backend.utils.converter import (
+    decode_cursor,
+    encode_cursor,
+    string_to_datetime,
+)
 
 router = APIRouter(
     prefix="/locations",
     tags=["locations"],
     responses={404: {"description": "Not found"}},
+    route_class=TimedRoute,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def get_output_format(
+    request: Request,
+    output: Optional[str] = Query(
+        None,
+        alias="format",
+        pattern="^(json|geojson|columnar|msgpack)$",
+        description="Response format; defaults to the Accept header",
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to include"
+    ),
+) -> OutputFormat:
+    try:
+        return OutputFormat(
+            negotiate_format(output, request.headers.get("accept")),
+            parse_fields(fields),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def location_list_response(
+    locations: List[LocationRecord],
+    output_format: OutputFormat,
+    response: Response,
+) -> Response:
+    response.headers["Vary"] = "Accept"
+    content, media_type = render_locations(locations, output_format)
+    return Response(
+        content=content, media_type=media_type, headers=response.headers
+    )
+
+
+async def check_not_modified(
+    request: Request,
+    response: Response,
+    db: AsyncSession,
+    changes: ChangeTracker,
+    *parts,
+    last_modified: Optional[datetime] = None,
+) -> Optional[Response]:
+    state = await changes.current(db)
+    if state is None:
+        return None
+
+    version, updated_at = state
+    etag = changes.etag(
+        version,
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        *parts,
+    )
+    last_modified = max(updated_at, last_modified or updated_at)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Vary": "Accept",
+    }
+
+    if is_not_modified(request.headers.items(), etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
 @router.get("/", response_model=List[LocationResponse])
 async def get_locations(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(
         100, ge=1, le=1000, description="Number of records to return"
     ),
     town: Optional[str] = Query(None, description="Filter by town name"),
-    db: Session = Depends(get_db),
+    match: str = Query(
+        "fuzzy",
+        pattern="^(exact|prefix|fuzzy)$",
+        description="How to match town: exact, prefix or fuzzy (contains)",
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Opaque cursor from X-Next-Cursor; overrides skip",
+    ),
+    db: AsyncSession = Depends(get_db),
+    changes: ChangeTracker = Depends(get_location_changes),
+    output_format: OutputFormat = Depends(get_output_format),
 ):
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            logger.error("Invalid cursor: %s", e)
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    not_modified = await check_not_modified(
+        request, response, db, changes, output_format.name
+    )
+    if not_modified:
+        return not_modified
+
     try:
         service = LocationService(db)
 
-        if town:
-            locations = service.get_locations_by_town(
-                town, skip=skip, limit=limit
+        if cursor is not None:
+            locations, next_cursor = await service.get_locations_page(
+                cursor=cursor, limit=limit, town=town, match=match
             )
         else:
-            locations = service.get_locations(skip=skip, limit=limit)
+            if town:
+                locations = await service.get_locations_by_town(
+                    town, skip=skip, limit=limit, match=match
+                )
+            else:
+                locations = await service.get_locations(skip=skip, limit=limit)
+            next_cursor = (
+                encode_cursor(locations[-1].post_time, locations[-1].id)
+                if len(locations) == limit
+                else None
+            )
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
         logger.info(
             "Successfully retrieved %d locations via API.", len(locations)
         )
-        return locations
+        return location_list_response(locations, output_format, response)
+    except ValueError as e:
+        logger.error("Invalid cursor: %s", e)
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
         logger.error("API error fetching locations: %s", e)
         raise HTTPException(
@@ -54,14 +211,212 @@ async def get_locations(
         )
 
 
+async def open_subscription(
+    broadcaster: LocationBroadcaster, last_id: Optional[int]
+) -> Subscription:
+    subscription = broadcaster.subscribe(last_id)
+    if subscription.gap:
+        async with AsyncSessionMaker() as db:
+            subscription.prepend(
+                await LocationService(db).get_locations_after_id(
+                    last_id, limit=settings.STREAM_REPLAY_SIZE
+                )
+            )
+    return subscription
+
+
+def sse_event(location: LocationResponse) -> str:
+    return (
+        f"id: {location.id}\n"
+        f"event: location\n"
+        f"data: {location.model_dump_json()}\n\n"
+    )
+
+
+@router.get("/stream")
+async def stream_locations_sse(
+    last_id: Optional[int] = Query(
+        None, ge=0, description="Resume after this location ID"
+    ),
+    last_event_id: Optional[int] = Header(None, ge=0),
+    broadcaster: LocationBroadcaster = Depends(get_broadcaster),
+):
+    try:
+        subscription = await open_subscription(
+            broadcaster, last_id if last_id is not None else last_event_id
+        )
+    except Exception as e:
+        logger.error("API error opening location stream: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Internal Server Error opening location stream",
+        )
+
+    async def events():
+        try:
+            while True:
+                try:
+                    location = await asyncio.wait_for(
+                        subscription.get(),
+                        timeout=settings.STREAM_KEEPALIVE_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if location is None:
+                    yield "event: error\ndata: slow consumer\n\n"
+                    return
+                yield sse_event(location)
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def stream_locations_ws(
+    websocket: WebSocket,
+    last_id: Optional[int] = Query(None, ge=0),
+    broadcaster: LocationBroadcaster = Depends(get_broadcaster),
+):
+    await websocket.accept()
+    subscription = await open_subscription(broadcaster, last_id)
+
+    async def forward():
+        while True:
+            location = await subscription.get()
+            if location is None:
+                await websocket.close(code=1013, reason="slow consumer")
+                return
+            await websocket.send_text(location.model_dump_json())
+
+    sender = asyncio.create_task(forward())
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        logger.info("Location stream client disconnected")
+    finally:
+        sender.cancel()
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/clusters", response_model=List[LocationCluster])
+async def get_location_clusters(
+    bbox: str = Query(
+        ...,
+        description="Bounding box as min_lon,min_lat,max_lon,max_lat",
+    ),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+    hours: int = Query(
+        24,
+        ge=1,
+        le=168,
+        description="Number of hours to look back (max 7 days)",
+    ),
+    db: AsyncSession = Depends(get_db),
+    hot_window: Optional[HotWindow] = Depends(get_hot_window),
+):
+    try:
+        min_lon, min_lat, max_lon, max_lat = map(float, bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid bbox. Use min_lon,min_lat,max_lon,max_lat.",
+        )
+    if not (-90 <= min_lat <= max_lat <= 90) or not (
+        -180 <= min_lon <= max_lon <= 180
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid bounding box. min values must not exceed max.",
+        )
+
+    try:
+        service = LocationService(db, hot_window)
+        clusters = await service.get_location_clusters(
+            min_lat,
+            min_lon,
+            max_lat,
+            max_lon,
+            zoom,
+            hours,
+            radius=settings.CLUSTER_RADIUS,
+            max_zoom=settings.CLUSTER_MAX_ZOOM,
+        )
+
+        logger.info(
+            "Successfully retrieved %d clusters at zoom %d via API.",
+            len(clusters),
+            zoom,
+        )
+        return clusters
+    except Exception as e:
+        logger.error("API error fetching location clusters: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Internal Server Error retrieving location clusters",
+        )
+
+
+@router.get("/export")
+async def export_locations(
+    since: str = Query(..., description="Start time, YYYY-MM-DDTHH:MM:SS"),
+    until: Optional[str] = Query(
+        None, description="End time (exclusive), YYYY-MM-DDTHH:MM:SS"
+    ),
+    output: str = Query(
+        "ndjson",
+        alias="format",
+        pattern="^(ndjson|csv|geojsonseq)$",
+        description="Export format: ndjson, csv or geojsonseq",
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to include"
+    ),
+):
+    try:
+        since_datetime = string_to_datetime(since)
+        until_datetime = string_to_datetime(until) if until else None
+        export_fields = parse_fields(fields) or LOCATION_FIELDS
+    except ValueError as e:
+        logger.error("Invalid export parameters: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def chunks():
+        exported = 0
+        yield export_header(output, export_fields)
+        async with AsyncSessionMaker() as db:
+            async for rows in LocationService(db).export_locations(
+                since_datetime,
+                until=until_datetime,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+            ):
+                exported += len(rows)
+                yield export_chunk(rows, output, export_fields)
+        logger.info("Exported %d locations since %s", exported, since)
+
+    filename = f"locations.{EXPORT_EXTENSIONS[output]}"
+    return StreamingResponse(
+        chunks(),
+        media_type=EXPORT_MEDIA_TYPES[output],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @router.get("/{location_id}", response_model=LocationResponse)
 async def get_location(
     location_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     try:
         service = LocationService(db)
-        location = service.get_location(location_id)
+        location = await service.get_location(location_id)
 
         if not location:
             raise HTTPException(status_code=404, detail="Location not found")
@@ -81,11 +436,12 @@ async def get_location(
 @router.post("/", response_model=LocationResponse, status_code=201)
 async def create_location(
     location: LocationCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    hot_window: Optional[HotWindow] = Depends(get_hot_window),
 ):
     try:
-        service = LocationService(db)
-        created_location = service.create_location(location)
+        service = LocationService(db, hot_window)
+        created_location = await service.create_location(location)
 
         logger.info(
             "Successfully created location with ID: %d", created_location.id
@@ -103,11 +459,12 @@ async def create_location(
 async def update_location(
     location_id: int,
     location: LocationUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    hot_window: Optional[HotWindow] = Depends(get_hot_window),
 ):
     try:
-        service = LocationService(db)
-        updated_location = service.update_location(location_id, location)
+        service = LocationService(db, hot_window)
+        updated_location = await service.update_location(location_id, location)
 
         if not updated_location:
             raise HTTPException(status_code=404, detail="Location not found")
@@ -127,11 +484,12 @@ async def update_location(
 @router.delete("/{location_id}", status_code=204)
 async def delete_location(
     location_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    hot_window: Optional[HotWindow] = Depends(get_hot_window),
 ):
     try:
-        service = LocationService(db)
-        deleted = service.delete_location(location_id)
+        service = LocationService(db, hot_window)
+        deleted = await service.delete_location(location_id)
 
         if not deleted:
             raise HTTPException(status_code=404, detail="Location not found")
@@ -150,17 +508,41 @@ async def delete_location(
 
 @router.get("/query/recent", response_model=List[LocationResponse])
 async def get_recent_locations(
+    request: Request,
+    response: Response,
     hours: int = Query(
         ...,
         ge=1,
         le=168,
         description="Number of hours to look back (max 7 days)",
     ),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    hot_window: Optional[HotWindow] = Depends(get_hot_window),
+    changes: ChangeTracker = Depends(get_location_changes),
+    output_format: OutputFormat = Depends(get_output_format),
 ):
+    state = (
+        hot_window.state_in_last_hours(hours)
+        if hot_window is not None
+        else None
+    )
+    if state is not None:
+        count, aged_out = state
+        not_modified = await check_not_modified(
+            request,
+            response,
+            db,
+            changes,
+            output_format.name,
+            count,
+            last_modified=aged_out,
+        )
+        if not_modified:
+            return not_modified
+
     try:
-        service = LocationService(db)
-        locations = service.get_recent_locations(hours)
+        service = LocationService(db, hot_window)
+        locations = await service.get_recent_locations(hours)
 
         if not locations:
             logger.warning("No locations found in the last %d hours.", hours)
@@ -170,7 +552,7 @@ async def get_recent_locations(
             "Successfully retrieved %d recent locations via API.",
             len(locations),
         )
-        return locations
+        return location_list_response(locations, output_format, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -185,13 +567,32 @@ async def get_recent_locations(
     "/query/since/{datetime_str}", response_model=List[LocationResponse]
 )
 async def get_locations_since(
+    request: Request,
+    response: Response,
     datetime_str: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+    hot_window: Optional[HotWindow] = Depends(get_hot_window),
+    changes: ChangeTracker = Depends(get_location_changes),
+    output_format: OutputFormat = Depends(get_output_format),
 ):
     try:
         since_datetime = string_to_datetime(datetime_str)
-        service = LocationService(db)
-        locations = service.get_locations_since(since_datetime)
+    except ValueError as e:
+        logger.error("Invalid datetime format: %s", e)
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid datetime format. Use YYYY-MM-DDTHH:MM:SS.",
+        )
+
+    not_modified = await check_not_modified(
+        request, response, db, changes, output_format.name
+    )
+    if not_modified:
+        return not_modified
+
+    try:
+        service = LocationService(db, hot_window)
+        locations = await service.get_locations_since(since_datetime)
 
         if not locations:
             logger.warning(
@@ -204,17 +605,165 @@ async def get_locations_since(
             len(locations),
             since_datetime,
         )
-        return locations
-    except ValueError as e:
-        logger.error("Invalid datetime format: %s", e)
+        return location_list_response(locations, output_format, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("API error fetching locations since datetime: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Internal Server Error retrieving locations",
+        )
+
+
+@router.get("/stats/heatmap", response_model=List[HeatmapCell])
+async def get_heatmap(
+    precision: int = Query(6, ge=1, le=9, description="Geohash precision"),
+    weekday: Optional[List[int]] = Query(
+        None, description="Days of week to include (0 = Monday)"
+    ),
+    hour: Optional[List[int]] = Query(
+        None, description="Hours of day to include (0-23)"
+    ),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    limit: int = Query(
+        1000, ge=1, le=10000, description="Number of cells to return"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    if precision not in settings.HEATMAP_PRECISIONS:
         raise HTTPException(
             status_code=400,
-            detail="Invalid datetime format. Use YYYY-MM-DDTHH:MM:SS.",
+            detail=f"precision must be one of {settings.HEATMAP_PRECISIONS}",
+        )
+    if any(day not in range(7) for day in weekday or ()) or any(
+        value not in range(24) for value in hour or ()
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="weekday must be 0-6 and hour must be 0-23",
+        )
+
+    bbox = (min_lat, min_lon, max_lat, max_lon)
+    if all(edge is None for edge in bbox):
+        bbox = None
+    elif any(edge is None for edge in bbox) or (
+        min_lat > max_lat or min_lon > max_lon
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid bounding box. Give all four edges, min <= max.",
+        )
+
+    try:
+        service = HeatmapService(db)
+        cells = await service.get_heatmap(
+            precision, weekdays=weekday, hours=hour, bbox=bbox, limit=limit
+        )
+
+        logger.info(
+            "Successfully retrieved %d heatmap cells via API.", len(cells)
+        )
+        return cells
+    except Exception as e:
+        logger.error("API error fetching heatmap: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Internal Server Error retrieving heatmap",
         )
+
+
+@router.get("/query/near", response_model=List[LocationResponse])
+async def get_locations_near(
+    response: Response,
+    lat: float = Query(..., ge=-90, le=90, description="Latitude"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude"),
+    radius_m: float = Query(
+        ..., gt=0, le=50000, description="Search radius in meters"
+    ),
+    hours: Optional[int] = Query(
+        None, ge=1, description="Only locations from the last N hours"
+    ),
+    limit: int = Query(
+        1000, ge=1, le=5000, description="Number of records to return"
+    ),
+    db: AsyncSession = Depends(get_db),
+    output_format: OutputFormat = Depends(get_output_format),
+):
+    try:
+        service = LocationService(db)
+        locations = await service.get_locations_near(
+            lat, lon, radius_m, hours=hours, limit=limit
+        )
+
+        if not locations:
+            logger.warning(
+                "No locations found within %sm of (%s, %s).",
+                radius_m,
+                lat,
+                lon,
+            )
+            raise HTTPException(status_code=404, detail="No locations found")
+
+        logger.info(
+            "Successfully retrieved %d nearby locations via API.",
+            len(locations),
+        )
+        return location_list_response(locations, output_format, response)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error("API error fetching locations since datetime: %s", e)
+        logger.error("API error fetching nearby locations: %s", e)
+        raise HTTPException(
+            status_code=500,
+            detail="Internal Server Error retrieving nearby locations",
+        )
+
+
+@router.get("/query/bbox", response_model=List[LocationResponse])
+async def get_locations_in_bbox(
+    response: Response,
+    min_lat: float = Query(..., ge=-90, le=90, description="South edge"),
+    min_lon: float = Query(..., ge=-180, le=180, description="West edge"),
+    max_lat: float = Query(..., ge=-90, le=90, description="North edge"),
+    max_lon: float = Query(..., ge=-180, le=180, description="East edge"),
+    hours: Optional[int] = Query(
+        None, ge=1, description="Only locations from the last N hours"
+    ),
+    limit: int = Query(
+        1000, ge=1, le=5000, description="Number of records to return"
+    ),
+    db: AsyncSession = Depends(get_db),
+    output_format: OutputFormat = Depends(get_output_format),
+):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid bounding box. min values must not exceed max.",
+        )
+
+    try:
+        service = LocationService(db)
+        locations = await service.get_locations_in_bbox(
+            min_lat, min_lon, max_lat, max_lon, hours=hours, limit=limit
+        )
+
+        if not locations:
+            logger.warning("No locations found in bounding box.")
+            raise HTTPException(status_code=404, detail="No locations found")
+
+        logger.info(
+            "Successfully retrieved %d locations in bbox via API.",
+            len(locations),
+        )
+        return location_list_response(locations, output_format, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("API error fetching locations in bbox: %s", e)
         raise HTTPException(
             status_code=500,
             detail="Internal Server Error retrieving locations",
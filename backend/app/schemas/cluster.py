@@ -0,0 +1,12 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class LocationCluster(BaseModel):
+    lat: float = Field(..., description="Latitude of the cluster centroid")
+    long: float = Field(..., description="Longitude of the cluster centroid")
+    count: int = Field(..., description="Number of locations in the cluster")
+    id: Optional[int] = Field(
+        None, description="Location ID when the cluster is a single point"
+    )
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class HeatmapCell(BaseModel):
+    cell: str = Field(..., description="Geohash of the cell")
+    lat: float = Field(..., description="Latitude of the cell centre")
+    long: float = Field(..., description="Longitude of the cell centre")
+    count: int = Field(..., description="Locations reported in the cell")
@@ -16,6 +16,12 @@ class LocationCreate(LocationBase):
     pass
 
 
+class LocationImport(LocationCreate):
+    post_time: Optional[datetime] = Field(
+        None, description="When the location was posted, defaults to now"
+    )
+
+
 class LocationUpdate(BaseModel):
     town: Optional[str] = None
     street: Optional[str] = None
@@ -1,21 +1,45 @@
 import asyncio
+import itertools
 import logging
-from asyncio import Queue
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import Dict, Hashable, Optional, Set, Tuple
 
-from backend.app.core.dependencies import get_db
-from backend.app.services.location_service import LocationService
+from backend.app.core.dependencies import (
+    broadcaster,
+    hot_window,
+    location_changes,
+    message_queue,
+    traces,
+)
+from backend.app.core.metrics import MESSAGES, hit_ratio, registry
+from backend.app.db.database import AsyncSessionMaker
+from backend.app.services.bulk_writer import LocationBulkWriter
+from backend.app.services.fast_extractor import LocationExtractor
+from backend.app.services.gazetteer import Gazetteer
+from backend.app.services.geocode_cache import GeocodeCache
+from backend.app.services.geocoder import GeocodingService
 from backend.app.services.messenger_client import MessengerClient
+from backend.app.services.parse_batcher import ParseBatcher
+from backend.app.services.parse_cache import NearDuplicateIndex, ParseCache
 from backend.app.services.parser import Parser
 from backend.app.services.record_creator import RecordCreator
-from backend.app.schemas.location import LocationCreate
+from backend.app.services.tracing import MessageTrace
+from backend.utils.text import normalize_text
 
-from backend.app.core.config import settings
+from backend.app.core.config import (
+    DEFAULT_TOWN,
+    KNOWN_TOWNS,
+    ZIELONA_GORA_DISTRICTS,
+    settings,
+)
 
 OPENROUTER_API_KEY = settings.OPENROUTER_API_KEY.get_secret_value()
 COOKIES_PATH = settings.COOKIES_PATH
 MODEL = settings.MODEL
 SYSTEM_PROMPT = settings.SYSTEM_PROMPT
 GENERAL_LOCATION = settings.GENERAL_LOCATION
+PIPELINE_WORKERS = settings.PIPELINE_WORKERS
 
 if not OPENROUTER_API_KEY:
     raise ValueError("OPENROUTER_API_KEY is not set")
@@ -31,15 +55,82 @@ if not GENERAL_LOCATION:
 
 logger = logging.getLogger(__name__)
 
+parse_cache = ParseCache(
+    max_size=settings.PARSE_CACHE_SIZE,
+    ttl=settings.PARSE_CACHE_TTL_SECONDS,
+    near_duplicates=(
+        NearDuplicateIndex(threshold=settings.NEAR_DUPLICATE_THRESHOLD)
+        if settings.NEAR_DUPLICATE_DETECTION
+        else None
+    ),
+)
+
 parser = Parser(
     open_router_api_key=OPENROUTER_API_KEY,
     system_prompt=SYSTEM_PROMPT,
     model=MODEL,
+    timeout=settings.LLM_TIMEOUT,
+    max_retries=settings.LLM_MAX_RETRIES,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    parse_cache=parse_cache,
+)
+
+geocode_cache = GeocodeCache(
+    session_factory=AsyncSessionMaker,
+    max_size=settings.GEOCODE_CACHE_SIZE,
+    negative_ttl=timedelta(hours=settings.GEOCODE_NEGATIVE_TTL_HOURS),
+)
+
+gazetteer = (
+    Gazetteer.from_file(settings.GAZETTEER_PATH)
+    if settings.GAZETTEER_PATH
+    else None
 )
 
-message_queue = Queue()
+geocoding_service = GeocodingService(
+    rate=settings.GEOCODE_RATE_LIMIT,
+    timeout=settings.GEOCODE_TIMEOUT,
+)
+
+fast_path_streets = []
+if gazetteer:
+    fast_path_streets += LocationExtractor.gazetteer_streets(gazetteer)
+if settings.FAST_PATH_STREETS_PATH:
+    fast_path_streets += LocationExtractor.load_streets(
+        settings.FAST_PATH_STREETS_PATH, DEFAULT_TOWN
+    )
+
+extractor = (
+    LocationExtractor(
+        KNOWN_TOWNS,
+        ZIELONA_GORA_DISTRICTS,
+        fast_path_streets,
+        default_town=DEFAULT_TOWN,
+    )
+    if settings.FAST_PATH_ENABLED
+    else None
+)
+
+batcher = (
+    ParseBatcher(
+        parser,
+        max_batch_size=settings.LLM_BATCH_SIZE,
+        max_wait=settings.LLM_BATCH_WAIT_MS / 1000,
+    )
+    if settings.LLM_BATCH_SIZE > 1
+    else None
+)
 
-record_creator = RecordCreator(parser, GENERAL_LOCATION)
+record_creator = RecordCreator(
+    parser,
+    GENERAL_LOCATION,
+    geocode_cache=geocode_cache,
+    gazetteer=gazetteer,
+    geocoding_service=geocoding_service,
+    extractor=extractor,
+    min_fast_path_confidence=settings.FAST_PATH_MIN_CONFIDENCE,
+    batcher=batcher,
+)
 
 
 async def run_listener():
@@ -61,61 +152,250 @@ async def run_listener():
         logger.error("Error: %s", e)
 
 
-async def message_handler():
+class CommitSequencer:
+    """Keeps DB writes for the same place in arrival order.
+
+    Every message declares the place it resolved to once it is parsed. A
+    write waits until all earlier messages have declared, and then only for
+    earlier messages about the same place, so a slow geocode does not hold
+    back unrelated reports.
+    """
+
+    def __init__(self):
+        self._declared_through = 0
+        self._declared: Set[int] = set()
+        self._places: Dict[int, Hashable] = {}
+        self._turn = asyncio.Condition()
+
+    async def declare(
+        self, sequence: int, place: Optional[Hashable] = None
+    ) -> None:
+        async with self._turn:
+            if sequence < self._declared_through or sequence in self._declared:
+                return
+            self._declared.add(sequence)
+            if place is not None:
+                self._places[sequence] = place
+            while self._declared_through in self._declared:
+                self._declared.remove(self._declared_through)
+                self._declared_through += 1
+            self._turn.notify_all()
+
+    def _is_turn(self, sequence: int) -> bool:
+        place = self._places.get(sequence)
+        if place is None:
+            return True
+        return self._declared_through > sequence and not any(
+            earlier < sequence and other == place
+            for earlier, other in self._places.items()
+        )
+
+    @asynccontextmanager
+    async def turn(self, sequence: int):
+        await self.declare(sequence)
+        async with self._turn:
+            await self._turn.wait_for(lambda: self._is_turn(sequence))
+            try:
+                yield
+            finally:
+                self._places.pop(sequence, None)
+                self._turn.notify_all()
+
+
+def location_place(location_data: Dict) -> Tuple[str, str]:
+    return (
+        normalize_text(location_data.get("town") or ""),
+        normalize_text(location_data.get("street") or ""),
+    )
+
+
+message_sequence = itertools.count()
+
+bulk_writer = LocationBulkWriter(
+    AsyncSessionMaker,
+    max_batch_size=settings.DB_WRITE_BATCH_SIZE,
+    max_wait=settings.DB_WRITE_BATCH_WAIT_MS / 1000,
+)
+
+commit_sequencer = CommitSequencer()
+
+
+def cache_stats():
+    stats = {
+        ("parse", "hit"): parse_cache.hits,
+        ("parse", "near_hit"): parse_cache.near_hits,
+        ("parse", "miss"): parse_cache.misses,
+        ("geocode", "memory_hit"): geocode_cache.memory_hits,
+        ("geocode", "db_hit"): geocode_cache.db_hits,
+        ("geocode", "miss"): geocode_cache.misses,
+    }
+    if gazetteer:
+        stats[("gazetteer", "hit")] = gazetteer.hits
+        stats[("gazetteer", "miss")] = gazetteer.misses
+    if hot_window is not None:
+        stats[("hot_window", "hit")] = hot_window.hits
+        stats[("hot_window", "miss")] = hot_window.misses
+    return stats
+
+
+def cache_hit_ratios():
+    totals = {}
+    for (cache, result), count in cache_stats().items():
+        hits, total = totals.get(cache, (0, 0))
+        if result != "miss":
+            hits += count
+        totals[cache] = (hits, total + count)
+    return {
+        (cache,): hit_ratio(hits, total)
+        for cache, (hits, total) in totals.items()
+    }
+
+
+registry.callback(
+    "antiradar_message_queue_depth",
+    "Messages waiting in the message queue",
+    message_queue.qsize,
+)
+registry.callback(
+    "antiradar_geocode_pending",
+    "Addresses waiting for the rate limited geocoder",
+    geocoding_service.pending,
+)
+registry.callback(
+    "antiradar_stream_subscribers_dropped",
+    "Stream subscribers disconnected for falling behind",
+    lambda: broadcaster.dropped,
+    kind="counter",
+)
+registry.callback(
+    "antiradar_db_row_retries",
+    "Locations re-inserted one by one after a failed batch insert",
+    lambda: bulk_writer.row_retries,
+    kind="counter",
+)
+registry.callback(
+    "antiradar_cache_lookups",
+    "Cache lookups by cache and result",
+    cache_stats,
+    labels=("cache", "result"),
+    kind="counter",
+)
+registry.callback(
+    "antiradar_cache_hit_ratio",
+    "Share of cache lookups answered without a miss",
+    cache_hit_ratios,
+    labels=("cache",),
+)
+
+
+async def store_location(
+    pending_write: asyncio.Future, trace: MessageTrace
+) -> None:
+    try:
+        created_location = await pending_write
+        trace.mark("written")
+        if hot_window is not None:
+            hot_window.add(created_location)
+        broadcaster.publish(created_location)
+        trace.mark("published")
+        trace.finish("stored", created_location.id)
+        MESSAGES.inc(outcome="stored")
+        logger.info(
+            "Successfully created location with ID: %d (trace %s)",
+            created_location.id,
+            trace.trace_id,
+        )
+    except Exception as e:
+        trace.finish("db_error")
+        MESSAGES.inc(outcome="db_error")
+        logger.error("Database error (trace %s): %s", trace.trace_id, e)
+
+
+async def message_handler(worker_id: int = 0):
     while True:
-        message = await message_queue.get()
+        trace = await message_queue.get()
+        trace.mark("dequeued")
+        sequence = next(message_sequence)
+        location_data = None
+        parse_error = None
+
+        async def parsed(parsed_data: Dict) -> None:
+            await commit_sequencer.declare(
+                sequence, location_place(parsed_data)
+            )
+
         try:
-            location_data = record_creator.create_record(message)
-            if location_data:
-                logger.info("Created record: %s", location_data)
-                db_session = next(get_db())
-                try:
-                    location_service = LocationService(db_session)
-                    created_location = location_service.create_location(
-                        location_data
-                    )
-                    logger.info(
-                        "Successfully created location with ID: %d",
-                        created_location.id,
+            location_data = await record_creator.create_record_async(
+                trace.message, trace.started, trace, on_parsed=parsed
+            )
+        except Exception as e:
+            parse_error = e
+            logger.error(
+                "Worker %d error processing message: %s", worker_id, e
+            )
+
+        pending_write = None
+        try:
+            async with commit_sequencer.turn(sequence):
+                if location_data:
+                    logger.info("Created record: %s", location_data)
+                    pending_write = bulk_writer.enqueue(location_data)
+                    trace.mark("write_queued")
+                elif parse_error is not None:
+                    trace.finish("parse_failed")
+                    MESSAGES.inc(outcome="parse_failed")
+                    logger.error(
+                        "Error creating record (trace %s)", trace.trace_id
                     )
+                else:
+                    trace.finish("no_location")
+                    MESSAGES.inc(outcome="no_location")
 
-                except Exception as e:
-                    logger.error("Database error: %s", e)
-                finally:
-                    try:
-                        db_session.close()
-                        logger.info("Database session closed")
-                    except Exception as e:
-                        logger.error("Error closing database session: %s", e)
-            else:
-                logger.error("Error creating record")
-        except Exception as e:
-            logger.error("Error processing message: %s", e)
+            if pending_write:
+                await store_location(pending_write, trace)
+        finally:
+            await commit_sequencer.declare(sequence)
+            traces.record(trace)
+            await message_queue.complete(trace)
 
 
 async def main():
+    try:
+        await message_queue.prepare()
+        await location_changes.prepare(AsyncSessionMaker)
+    except Exception as e:
+        logger.critical(
+            "Pipeline tables are unavailable, not starting the pipeline: %s",
+            e,
+        )
+        raise
+
     listener_task = asyncio.create_task(run_listener())
-    handler_task = asyncio.create_task(message_handler())
+    handler_tasks = [
+        asyncio.create_task(message_handler(worker_id))
+        for worker_id in range(PIPELINE_WORKERS)
+    ]
+    logger.info("Started %d pipeline workers", len(handler_tasks))
 
     try:
         await asyncio.gather(
-            listener_task, handler_task, return_exceptions=True
+            listener_task, *handler_tasks, return_exceptions=True
         )
     except Exception as e:
         logger.error("Error in main execution: %s", e)
-        if not listener_task.done():
-            listener_task.cancel()
-        if not handler_task.done():
-            handler_task.cancel()
+        for task in [listener_task, *handler_tasks]:
+            if not task.done():
+                task.cancel()
 
-        try:
-            await listener_task
-        except asyncio.CancelledError:
-            pass
-        try:
-            await handler_task
-        except asyncio.CancelledError:
-            pass
+        for task in [listener_task, *handler_tasks]:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+    finally:
+        await parser.aclose()
+        await geocoding_service.close()
+        await bulk_writer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Set
+
+from backend.app.schemas.location import LocationResponse
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(
+        self, buffer_size: int, backlog: Iterable[LocationResponse] = ()
+    ):
+        self.backlog: Deque[LocationResponse] = deque(backlog)
+        self._replayed: Set[int] = {location.id for location in self.backlog}
+        self.gap = False
+        self.dropped = False
+        self._queue: "asyncio.Queue[Optional[LocationResponse]]" = (
+            asyncio.Queue(buffer_size)
+        )
+
+    def prepend(self, locations: Iterable[LocationResponse]) -> None:
+        missed = [
+            location
+            for location in locations
+            if location.id not in self._replayed
+        ]
+        self._replayed.update(location.id for location in missed)
+        self.backlog = deque(
+            sorted([*missed, *self.backlog], key=lambda location: location.id)
+        )
+
+    def _offer(self, location: LocationResponse) -> bool:
+        try:
+            self._queue.put_nowait(location)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def _drop(self) -> None:
+        self.dropped = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[LocationResponse]:
+        if self.backlog:
+            return self.backlog.popleft()
+
+        while True:
+            location = await self._queue.get()
+            if location is None or location.id not in self._replayed:
+                return location
+
+
+class LocationBroadcaster:
+    def __init__(self, buffer_size: int = 256, replay_size: int = 1000):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+        self._recent: Deque[LocationResponse] = deque(maxlen=replay_size)
+
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, location: LocationResponse) -> None:
+        self._recent.append(location)
+        self.published += 1
+
+        for subscription in list(self._subscribers):
+            if not subscription._offer(location):
+                logger.warning(
+                    "Dropping slow stream subscriber after %d buffered events",
+                    self.buffer_size,
+                )
+                subscription._drop()
+                self._subscribers.discard(subscription)
+                self.dropped += 1
+
+    def subscribe(self, last_id: Optional[int] = None) -> Subscription:
+        backlog = (
+            [location for location in self._recent if location.id > last_id]
+            if last_id is not None
+            else []
+        )
+        subscription = Subscription(self.buffer_size, backlog)
+        subscription.gap = last_id is not None and (
+            not self._recent or self._recent[0].id > last_id + 1
+        )
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.metrics import DB_WRITE_SECONDS
+from backend.app.repositories.location import LocationRepository
+from backend.app.schemas.location import (
+    LocationCreate,
+    LocationImport,
+    LocationResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LocationBulkWriter:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int = 100,
+        max_wait: float = 0.05,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._pending: List[Tuple[LocationCreate, asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.batches_written = 0
+        self.rows_written = 0
+        self.row_retries = 0
+
+    def enqueue(self, location_data: LocationCreate) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((location_data, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+        return future
+
+    async def submit(self, location_data: LocationCreate) -> LocationResponse:
+        return await self.enqueue(location_data)
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            try:
+                await asyncio.wait_for(
+                    self._batch_full.wait(), timeout=self.max_wait
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("Location flusher error: %s", e)
+
+    def _take_batch(self) -> List[Tuple[LocationCreate, asyncio.Future]]:
+        batch = self._pending[: self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size :]
+        if not self._pending:
+            self._has_pending.clear()
+        if len(self._pending) < self.max_batch_size:
+            self._batch_full.clear()
+        return batch
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            while self._pending:
+                await self._write(self._take_batch())
+
+    async def _write(
+        self, batch: List[Tuple[LocationCreate, asyncio.Future]]
+    ) -> None:
+        try:
+            with DB_WRITE_SECONDS.time(mode="batch"):
+                async with self.session_factory() as db:
+                    created = await LocationRepository(db).create_many(
+                        [location_data for location_data, _ in batch]
+                    )
+            self.batches_written += 1
+            self.rows_written += len(created)
+            for (_, future), location in zip(batch, created):
+                if not future.done():
+                    future.set_result(
+                        LocationResponse.model_validate(location)
+                    )
+            return
+        except SQLAlchemyError as e:
+            logger.warning(
+                "Batch insert of %d locations failed, retrying row by row: %s",
+                len(batch),
+                e,
+            )
+        except Exception as e:
+            logger.error(
+                "Batch insert of %d locations failed: %s", len(batch), e
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for location_data, future in batch:
+            self.row_retries += 1
+            try:
+                with DB_WRITE_SECONDS.time(mode="row"):
+                    async with self.session_factory() as db:
+                        location = await LocationRepository(db).create(
+                            location_data
+                        )
+                self.rows_written += 1
+                if not future.done():
+                    future.set_result(
+                        LocationResponse.model_validate(location)
+                    )
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def copy(
+        self, locations_data: List[LocationImport], chunk_size: int = 10000
+    ) -> int:
+        copied = 0
+        for start in range(0, len(locations_data), chunk_size):
+            async with self.session_factory() as db:
+                copied += await LocationRepository(db).copy_many(
+                    locations_data[start : start + chunk_size]
+                )
+        return copied
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._flusher is not None:
+            self._flusher.cancel()
@@ -0,0 +1,88 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Iterable, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.models.models import ChangeVersion
+from backend.app.repositories.change_version import (
+    LOCATIONS,
+    ChangeVersionRepository,
+)
+
+
+class ChangeTracker:
+    def __init__(self, scope: str = LOCATIONS):
+        self.scope = scope
+
+    async def prepare(
+        self, session_factory: Callable[[], AsyncSession]
+    ) -> None:
+        async with session_factory() as db:
+            connection = await db.connection()
+            await connection.run_sync(
+                ChangeVersion.__table__.create, checkfirst=True
+            )
+            await ChangeVersionRepository(db).ensure(self.scope)
+
+    async def current(
+        self, db: AsyncSession
+    ) -> Optional[Tuple[int, datetime]]:
+        try:
+            row = await ChangeVersionRepository(db).get(self.scope)
+        except SQLAlchemyError:
+            return None
+        if row is None:
+            return None
+
+        updated_at = row.updated_at
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        return row.version, updated_at.replace(microsecond=0)
+
+    def etag(self, version: int, scope: str, *parts: object) -> str:
+        digest = hashlib.blake2b(
+            repr((scope, parts)).encode(), digest_size=8
+        ).hexdigest()
+        return f'W/"{version}-{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified_since(
+    if_modified_since: str, last_modified: datetime
+) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def is_not_modified(
+    headers: Iterable[Tuple[str, str]],
+    etag: str,
+    last_modified: Optional[datetime],
+) -> bool:
+    headers = {name.lower(): value for name, value in headers}
+    if "if-none-match" in headers:
+        return etag_matches(headers["if-none-match"], etag)
+    if "if-modified-since" in headers and last_modified is not None:
+        return not_modified_since(headers["if-modified-since"], last_modified)
+    return False
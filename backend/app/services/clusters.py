@@ -0,0 +1,143 @@
+import bisect
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.app.schemas.cluster import LocationCluster
+
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def project(lat: float, lon: float) -> Tuple[float, float]:
+    lat = max(min(lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    sin = math.sin(math.radians(lat))
+    x = lon / 360 + 0.5
+    y = 0.5 - 0.25 * math.log((1 + sin) / (1 - sin)) / math.pi
+    return x, min(max(y, 0.0), 1.0)
+
+
+def unproject(x: float, y: float) -> Tuple[float, float]:
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, (x - 0.5) * 360
+
+
+class ClusterIndex:
+    def __init__(
+        self,
+        window: timedelta,
+        radius: float = 60,
+        extent: float = 512,
+        max_zoom: int = 16,
+    ):
+        self.window = window
+        self.max_zoom = max_zoom
+        self._cell_sizes = [
+            radius / (extent * 2**zoom) for zoom in range(max_zoom + 1)
+        ]
+
+        self._points: Dict[int, Tuple[datetime, float, float]] = {}
+        self._order: List[Tuple[datetime, int]] = []
+        self._grids: List[Dict[Tuple[int, int], List[float]]] = [
+            {} for _ in range(max_zoom + 1)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _update(self, x: float, y: float, location_id: int, sign: int) -> None:
+        for size, grid in zip(self._cell_sizes, self._grids):
+            key = (int(x / size), int(y / size))
+            cell = grid.setdefault(key, [0, 0.0, 0.0, 0])
+            cell[0] += sign
+            cell[1] += sign * x
+            cell[2] += sign * y
+            cell[3] += sign * location_id
+            if not cell[0]:
+                del grid[key]
+
+    def add(
+        self,
+        location_id: int,
+        post_time: datetime,
+        lat: Optional[float],
+        long: Optional[float],
+    ) -> None:
+        if lat is None or long is None or location_id in self._points:
+            return
+        x, y = project(lat, long)
+        self._points[location_id] = (post_time, x, y)
+        bisect.insort(self._order, (post_time, location_id))
+        self._update(x, y, location_id, 1)
+
+    def remove(self, location_id: int) -> None:
+        point = self._points.pop(location_id, None)
+        if point is None:
+            return
+        post_time, x, y = point
+        del self._order[
+            bisect.bisect_left(self._order, (post_time, location_id))
+        ]
+        self._update(x, y, location_id, -1)
+
+    def evict(self, now: datetime) -> None:
+        cut = bisect.bisect_left(self._order, (now - self.window, -1))
+        for _, location_id in self._order[:cut]:
+            _, x, y = self._points.pop(location_id)
+            self._update(x, y, location_id, -1)
+        del self._order[:cut]
+
+    def clusters(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        zoom: int,
+    ) -> List[LocationCluster]:
+        zoom = max(0, min(zoom, self.max_zoom))
+        size = self._cell_sizes[zoom]
+        grid = self._grids[zoom]
+
+        min_x, max_y = project(min_lat, min_lon)
+        max_x, min_y = project(max_lat, max_lon)
+        x_range = range(int(min_x / size), int(max_x / size) + 1)
+        y_range = range(int(min_y / size), int(max_y / size) + 1)
+
+        if len(x_range) * len(y_range) < len(grid):
+            keys: Iterable[Tuple[int, int]] = (
+                (cx, cy) for cx in x_range for cy in y_range
+            )
+        else:
+            keys = list(grid)
+
+        result = []
+        for key in keys:
+            cell = grid.get(key)
+            if cell is None:
+                continue
+            count, sum_x, sum_y, sum_id = cell
+            x, y = sum_x / count, sum_y / count
+            if not (min_x <= x <= max_x and min_y <= y <= max_y):
+                continue
+            lat, long = unproject(x, y)
+            result.append(
+                LocationCluster(
+                    lat=lat,
+                    long=long,
+                    count=int(count),
+                    id=int(sum_id) if count == 1 else None,
+                )
+            )
+        return result
+
+
+def build_index(
+    locations: Iterable,
+    window: timedelta,
+    radius: float = 60,
+    max_zoom: int = 16,
+) -> ClusterIndex:
+    index = ClusterIndex(window, radius=radius, max_zoom=max_zoom)
+    for location in locations:
+        index.add(location.id, location.post_time, location.lat, location.long)
+    return index
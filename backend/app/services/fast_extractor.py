@@ -0,0 +1,265 @@
+import logging
+import re
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from backend.app.services.gazetteer import (
+    Gazetteer,
+    stem_token,
+    tokenize_name,
+)
+from backend.utils.text import fold_diacritics, normalize_text
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+FILLER_TOKENS = {
+    stem_token(token)
+    for token in (
+        "na",
+        "w",
+        "we",
+        "do",
+        "przy",
+        "przed",
+        "za",
+        "pod",
+        "od",
+        "kolo",
+        "obok",
+        "z",
+        "i",
+        "ul",
+        "al",
+        "susza",
+        "suszarka",
+        "stoja",
+        "stoi",
+        "kontrola",
+        "policja",
+        "radar",
+        "uwaga",
+    )
+}
+
+
+LOCATION_CUES = {
+    stem_token(token)
+    for token in (
+        "na",
+        "w",
+        "we",
+        "do",
+        "przy",
+        "przed",
+        "za",
+        "pod",
+        "kolo",
+        "obok",
+        "os",
+    )
+}
+
+
+def message_tokens(message: str) -> List[str]:
+    folded = fold_diacritics(normalize_text(message))
+    return [stem_token(token) for token in _NON_WORD.split(folded) if token]
+
+
+class Keyword(NamedTuple):
+    kind: str
+    name: str
+    town: str
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    keywords: Tuple[Keyword, ...]
+
+
+class Extraction(NamedTuple):
+    town: str
+    street: str
+    confidence: float
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"town": self.town, "street": self.street}
+
+
+class TokenAutomaton:
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Keyword]]] = [[]]
+
+    def add(self, tokens: List[str], keyword: Keyword) -> None:
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][token] = next_state
+            state = next_state
+        self._output[state].append((len(tokens), keyword))
+
+    def build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(token, 0)
+                self._output[next_state] = (
+                    self._output[next_state]
+                    + self._output[self._fail[next_state]]
+                )
+
+    def search(self, tokens: List[str]) -> List[Match]:
+        found: Dict[Tuple[int, int], List[Keyword]] = {}
+        state = 0
+        for position, token in enumerate(tokens):
+            while state and token not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(token, 0)
+            for length, keyword in self._output[state]:
+                span = (position - length + 1, position + 1)
+                found.setdefault(span, []).append(keyword)
+
+        matches = []
+        covered_until = -1
+        for (start, end), keywords in sorted(
+            found.items(), key=lambda item: (item[0][0], -item[0][1])
+        ):
+            if start >= covered_until:
+                matches.append(Match(start, end, tuple(keywords)))
+                covered_until = end
+        return matches
+
+
+class LocationExtractor:
+    def __init__(
+        self,
+        towns: Iterable[str],
+        districts: Iterable[str],
+        streets: Iterable[Tuple[str, str]] = (),
+        default_town: str = "Zielona Góra",
+    ):
+        self.default_town = default_town
+        self._automaton = TokenAutomaton()
+
+        for town in towns:
+            self._automaton.add(
+                message_tokens(town), Keyword("town", town, town)
+            )
+        for district in districts:
+            self._automaton.add(
+                message_tokens(district),
+                Keyword("district", district, district),
+            )
+        for town, street in streets:
+            self._automaton.add(
+                tokenize_name(street), Keyword("street", street, town)
+            )
+
+        self._automaton.build()
+
+    @staticmethod
+    def load_streets(path: str, default_town: str) -> List[Tuple[str, str]]:
+        streets = []
+        with open(path, encoding="utf-8") as streets_file:
+            for line in streets_file:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                town, _, street = line.rpartition("\t")
+                streets.append((town or default_town, street))
+        return streets
+
+    @staticmethod
+    def gazetteer_streets(gazetteer: Gazetteer) -> List[Tuple[str, str]]:
+        return [(entry.town, entry.name) for entry in gazetteer.streets()]
+
+    @staticmethod
+    def _has_cue(tokens: List[str], match: Match) -> bool:
+        return match.start > 0 and tokens[match.start - 1] in LOCATION_CUES
+
+    def extract(self, message: str) -> Extraction:
+        tokens = message_tokens(message)
+        matches = self._automaton.search(tokens)
+
+        places = {
+            keyword.name
+            for match in matches
+            for keyword in match.keywords
+            if keyword.kind != "street"
+        }
+        street_matches = [
+            match
+            for match in matches
+            if any(keyword.kind == "street" for keyword in match.keywords)
+        ]
+
+        town = next(iter(places)) if len(places) == 1 else None
+        content = sum(token not in FILLER_TOKENS for token in tokens)
+        matched = {
+            position
+            for match in matches
+            for position in range(match.start, match.end)
+        }
+        unmatched = any(
+            token not in FILLER_TOKENS and position not in matched
+            for position, token in enumerate(tokens)
+        )
+        coverage = (
+            sum(match.end - match.start for match in matches) / content
+            if content
+            else 0.0
+        )
+
+        if len(places) > 1 or len(street_matches) > 1:
+            return Extraction(town or "", "", 0.3)
+
+        if street_matches:
+            candidates = [
+                keyword
+                for keyword in street_matches[0].keywords
+                if keyword.kind == "street"
+            ]
+            preferred = town or self.default_town
+            street = next((k for k in candidates if k.town == preferred), None)
+            if street is None and town is None and len(candidates) == 1:
+                street = candidates[0]
+            if street is None:
+                return Extraction(preferred, "", 0.3)
+
+            confidence = 0.75
+            if town is not None:
+                confidence += 0.15
+            if coverage >= 0.5:
+                confidence += 0.1
+            return Extraction(street.town, street.name, confidence)
+
+        if town is not None:
+            district_only = all(
+                keyword.kind == "district"
+                for match in matches
+                for keyword in match.keywords
+            )
+            if unmatched or (
+                district_only
+                and not any(self._has_cue(tokens, match) for match in matches)
+            ):
+                return Extraction(town, "", 0.5)
+            return Extraction(town, "", 0.85)
+
+        return Extraction("", "", 0.0)
@@ -0,0 +1,195 @@
+import csv
+import difflib
+import gzip
+import logging
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from backend.utils.text import fold_diacritics, normalize_text
+
+logger = logging.getLogger(__name__)
+
+STREET_PREFIXES = {
+    "ul",
+    "ulica",
+    "ulicy",
+    "al",
+    "aleja",
+    "alei",
+    "pl",
+    "plac",
+    "placu",
+    "os",
+    "osiedle",
+    "osiedlu",
+}
+
+INFLECTION_ENDINGS = sorted(
+    [
+        "owie",
+        "owej",
+        "owa",
+        "owe",
+        "owy",
+        "ami",
+        "ach",
+        "ego",
+        "emu",
+        "owi",
+        "iem",
+        "ow",
+        "om",
+        "ie",
+        "ej",
+        "a",
+        "e",
+        "i",
+        "y",
+        "u",
+        "o",
+    ],
+    key=len,
+    reverse=True,
+)
+
+# Locative endings that also soften the stem consonant (Góra -> Górze,
+# Zawada -> Zawadzie, Babimost -> Babimoście), folded back to the consonant.
+SOFTENED_ENDINGS = (
+    ("scie", "st"),
+    ("dzie", "d"),
+    ("cie", "t"),
+    ("rze", "r"),
+)
+
+MIN_STEM_LENGTH = 3
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def stem_token(token: str) -> str:
+    for ending, stem in SOFTENED_ENDINGS:
+        if (
+            token.endswith(ending)
+            and len(token) - len(ending) + len(stem) >= MIN_STEM_LENGTH
+        ):
+            return token[: -len(ending)] + stem
+    for ending in INFLECTION_ENDINGS:
+        if (
+            token.endswith(ending)
+            and len(token) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return token[: -len(ending)]
+    return token
+
+
+def tokenize_name(value: str) -> List[str]:
+    folded = fold_diacritics(normalize_text(value))
+    tokens = [token for token in _NON_WORD.split(folded) if token]
+    while tokens and tokens[0] in STREET_PREFIXES:
+        tokens = tokens[1:]
+    return [stem_token(token) for token in tokens]
+
+
+def name_key(value: str) -> str:
+    return " ".join(tokenize_name(value))
+
+
+class GazetteerEntry(NamedTuple):
+    town: str
+    name: str
+    kind: str
+    latitude: float
+    longitude: float
+
+
+class Gazetteer:
+    def __init__(
+        self, entries: Iterable[GazetteerEntry], fuzzy_cutoff: float = 0.85
+    ):
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._towns: Dict[str, GazetteerEntry] = {}
+        self._streets: Dict[str, Dict[str, GazetteerEntry]] = {}
+
+        for entry in entries:
+            town = name_key(entry.town)
+            if entry.kind == "town":
+                self._towns[town] = entry
+            else:
+                self._streets.setdefault(town, {})[
+                    name_key(entry.name)
+                ] = entry
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "Gazetteer":
+        opener = gzip.open if path.endswith(".gz") else open
+        entries = []
+        with opener(path, "rt", encoding="utf-8") as gazetteer_file:
+            for row in csv.reader(gazetteer_file, delimiter="\t"):
+                if not row or row[0].startswith("#"):
+                    continue
+                town, name, kind, latitude, longitude = row
+                entries.append(
+                    GazetteerEntry(
+                        town, name, kind, float(latitude), float(longitude)
+                    )
+                )
+
+        gazetteer = cls(entries, **kwargs)
+        logger.info(
+            "Loaded gazetteer with %d entries from %s", len(entries), path
+        )
+        return gazetteer
+
+    def __len__(self) -> int:
+        return len(self._towns) + sum(
+            len(streets) for streets in self._streets.values()
+        )
+
+    def streets(self) -> Iterator[GazetteerEntry]:
+        for streets in self._streets.values():
+            yield from streets.values()
+
+    def _closest(self, key: str, candidates: Iterable[str]) -> Optional[str]:
+        matches = difflib.get_close_matches(
+            key, list(candidates), n=1, cutoff=self.fuzzy_cutoff
+        )
+        return matches[0] if matches else None
+
+    def _resolve_town(self, town: str) -> Optional[str]:
+        key = name_key(town)
+        if key in self._towns or key in self._streets:
+            return key
+        return self._closest(key, set(self._towns) | set(self._streets))
+
+    def _resolve_street(
+        self, streets: Dict[str, GazetteerEntry], street: str
+    ) -> Optional[GazetteerEntry]:
+        tokens = tokenize_name(street)
+        for length in range(len(tokens), 0, -1):
+            entry = streets.get(" ".join(tokens[:length]))
+            if entry:
+                return entry
+
+        key = self._closest(" ".join(tokens), streets)
+        return streets[key] if key else None
+
+    def resolve(self, town: str, street: str) -> Optional[GazetteerEntry]:
+        entry = None
+        town_key = self._resolve_town(town) if town else None
+
+        if town_key is not None:
+            if street:
+                entry = self._resolve_street(
+                    self._streets.get(town_key, {}), street
+                )
+            else:
+                entry = self._towns.get(town_key)
+
+        if entry:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
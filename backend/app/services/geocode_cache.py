@@ -0,0 +1,170 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, NamedTuple, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.db.models.models import GeocodeCacheEntry
+from backend.app.repositories.heatmap import UPSERT_DIALECTS
+from backend.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class Coordinates(NamedTuple):
+    latitude: float
+    longitude: float
+
+
+class CachedGeocode(NamedTuple):
+    coordinates: Optional[Coordinates]
+    cached_at: datetime
+
+
+class GeocodeCache:
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AsyncSession]] = None,
+        max_size: int = 1024,
+        negative_ttl: timedelta = timedelta(hours=24),
+    ):
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+
+        self._entries: "OrderedDict[str, CachedGeocode]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(town: str, street: str, general_location: str) -> str:
+        return "|".join(
+            normalize_text(part) for part in (town, street, general_location)
+        )
+
+    def _is_expired(self, entry: CachedGeocode) -> bool:
+        if entry.coordinates is not None:
+            return False
+        age = datetime.now(timezone.utc) - entry.cached_at
+        return age > self.negative_ttl
+
+    def _remember(self, key: str, entry: CachedGeocode) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def peek(self, key: str) -> Optional[CachedGeocode]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            return entry
+
+    def remember(
+        self, key: str, coordinates: Optional[Coordinates]
+    ) -> CachedGeocode:
+        entry = CachedGeocode(coordinates, datetime.now(timezone.utc))
+        self._remember(key, entry)
+        return entry
+
+    async def get(self, key: str) -> Optional[CachedGeocode]:
+        entry = self.peek(key)
+        if entry is not None:
+            return entry
+
+        entry = await self._load(key)
+        if entry is not None and not self._is_expired(entry):
+            self._remember(key, entry)
+            self.db_hits += 1
+            return entry
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, coordinates: Optional[Coordinates]) -> None:
+        await self._store(key, self.remember(key, coordinates))
+
+    async def _load(self, key: str) -> Optional[CachedGeocode]:
+        if self.session_factory is None:
+            return None
+
+        async with self.session_factory() as db:
+            try:
+                row = await db.get(GeocodeCacheEntry, key)
+                if row is None:
+                    return None
+
+                coordinates = (
+                    Coordinates(row.lat, row.long)
+                    if row.lat is not None and row.long is not None
+                    else None
+                )
+                cached_at = row.cached_at
+                if cached_at.tzinfo is None:
+                    cached_at = cached_at.replace(tzinfo=timezone.utc)
+                return CachedGeocode(coordinates, cached_at)
+            except SQLAlchemyError as e:
+                logger.error(
+                    "Database error reading geocode cache %s: %s", key, e
+                )
+                return None
+
+    async def _store(self, key: str, entry: CachedGeocode) -> None:
+        if self.session_factory is None:
+            return
+
+        async with self.session_factory() as db:
+            try:
+                connection = await db.connection()
+                statement = UPSERT_DIALECTS[connection.dialect.name](
+                    GeocodeCacheEntry
+                ).values(
+                    key=key,
+                    lat=(
+                        entry.coordinates.latitude
+                        if entry.coordinates
+                        else None
+                    ),
+                    long=(
+                        entry.coordinates.longitude
+                        if entry.coordinates
+                        else None
+                    ),
+                    cached_at=entry.cached_at,
+                )
+                await db.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[GeocodeCacheEntry.key],
+                        set_={
+                            "lat": statement.excluded.lat,
+                            "long": statement.excluded.long,
+                            "cached_at": statement.excluded.cached_at,
+                        },
+                    )
+                )
+                await db.commit()
+            except SQLAlchemyError as e:
+                logger.error(
+                    "Database error writing geocode cache %s: %s", key, e
+                )
+                await db.rollback()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+        }
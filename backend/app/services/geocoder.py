@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from geopy.adapters import AioHTTPAdapter
+from geopy.geocoders import Nominatim
+
+from backend.app.services.geocode_cache import Coordinates
+from backend.utils.text import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        self._refill()
+        while self._tokens < 1:
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._refill()
+        self._tokens -= 1
+
+
+class GeocodingService:
+    def __init__(
+        self,
+        user_agent: str = "Antiradar",
+        rate: float = 1.0,
+        burst: int = 1,
+        timeout: float = 10.0,
+    ):
+        self.geolocator = Nominatim(
+            user_agent=user_agent,
+            adapter_factory=AioHTTPAdapter,
+            timeout=timeout,
+        )
+        self._bucket = TokenBucket(rate, burst)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[float, int, str, str]] = []
+        self._order = itertools.count()
+        self._has_pending = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._requests: Set[asyncio.Task] = set()
+
+        self.upstream_calls = 0
+        self.coalesced = 0
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def geocode(
+        self, address: str, received_at: Optional[float] = None
+    ) -> Optional[Coordinates]:
+        key = normalize_text(address)
+        future = self._in_flight.get(key)
+
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._in_flight[key] = future
+            received_at = (
+                time.monotonic() if received_at is None else received_at
+            )
+            heapq.heappush(
+                self._pending,
+                (-received_at, next(self._order), key, address),
+            )
+            self._has_pending.set()
+            self._ensure_dispatcher()
+        else:
+            self.coalesced += 1
+            logger.info("Coalescing geocode request for %s", address)
+
+        return await asyncio.shield(future)
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._pending:
+                self._has_pending.clear()
+                await self._has_pending.wait()
+                continue
+
+            await self._bucket.acquire()
+            _, _, key, address = heapq.heappop(self._pending)
+
+            request = asyncio.create_task(self._resolve(key, address))
+            self._requests.add(request)
+            request.add_done_callback(self._requests.discard)
+
+    async def _resolve(self, key: str, address: str) -> None:
+        future = self._in_flight[key]
+        try:
+            self.upstream_calls += 1
+            logger.info("Geocoding address: %s", address)
+            location = await self.geolocator.geocode(address)
+            future.set_result(
+                Coordinates(location.latitude, location.longitude)
+                if location
+                else None
+            )
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            del self._in_flight[key]
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        for request in list(self._requests):
+            request.cancel()
+        await self.geolocator.__aexit__(None, None, None)
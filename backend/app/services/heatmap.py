@@ -0,0 +1,43 @@
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.repositories.heatmap import HeatmapRepository
+from backend.app.schemas.heatmap import HeatmapCell
+from backend.utils import geohash
+
+logger = logging.getLogger(__name__)
+
+
+class HeatmapService:
+    def __init__(self, db: AsyncSession):
+        self.repository = HeatmapRepository(db)
+
+    async def get_heatmap(
+        self,
+        precision: int,
+        weekdays: Optional[Sequence[int]] = None,
+        hours: Optional[Sequence[int]] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        limit: Optional[int] = None,
+    ) -> List[HeatmapCell]:
+        rows = await self.repository.get_cells(
+            precision,
+            weekdays=weekdays,
+            hours=hours,
+            bbox=bbox,
+            limit=None if bbox is not None else limit,
+        )
+
+        cells = []
+        for row in rows:
+            lat, long = geohash.decode(row.cell)
+            if bbox is not None and not (
+                bbox[0] <= lat <= bbox[2] and bbox[1] <= long <= bbox[3]
+            ):
+                continue
+            cells.append(
+                HeatmapCell(cell=row.cell, lat=lat, long=long, count=row.count)
+            )
+        return cells[:limit] if limit is not None else cells
@@ -0,0 +1,183 @@
+import bisect
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.repositories.location import LocationRepository
+from backend.app.schemas.location import LocationResponse
+from backend.app.services.clusters import ClusterIndex
+
+logger = logging.getLogger(__name__)
+
+
+def as_aware(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.astimezone()
+
+
+class HotWindow:
+    def __init__(
+        self,
+        window: timedelta = timedelta(hours=168),
+        cluster_radius: float = 60,
+        cluster_max_zoom: int = 16,
+        cluster_cache_size: int = 8,
+    ):
+        self.window = window
+        self.ready = False
+
+        self.cluster_radius = cluster_radius
+        self.cluster_max_zoom = cluster_max_zoom
+        self.cluster_cache_size = cluster_cache_size
+        self._clusters: "OrderedDict[int, ClusterIndex]" = OrderedDict()
+
+        self._keys: List[Tuple[datetime, int]] = []
+        self._locations: List[LocationResponse] = []
+        self._by_id: Dict[int, Tuple[datetime, int]] = {}
+        self._evicted_until: Optional[datetime] = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def _cutoff(self) -> datetime:
+        return datetime.now().astimezone() - self.window
+
+    def _evict(self) -> None:
+        cut = bisect.bisect_left(self._keys, (self._cutoff(), -1))
+        if not cut:
+            return
+        for _, location_id in self._keys[:cut]:
+            del self._by_id[location_id]
+        self._evicted_until = self._keys[cut - 1][0]
+        del self._keys[:cut]
+        del self._locations[:cut]
+
+    def add(self, location: LocationResponse) -> None:
+        self.discard(location.id)
+        key = (as_aware(location.post_time), location.id)
+        if key[0] < self._cutoff():
+            return
+
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._locations.insert(position, location)
+        self._by_id[location.id] = key
+        for index in self._clusters.values():
+            index.add(location.id, key[0], location.lat, location.long)
+        self._evict()
+
+    def discard(self, location_id: int) -> None:
+        key = self._by_id.pop(location_id, None)
+        if key is None:
+            return
+        for index in self._clusters.values():
+            index.remove(location_id)
+        position = bisect.bisect_left(self._keys, key)
+        del self._keys[position]
+        del self._locations[position]
+
+    def covers(self, since: datetime) -> bool:
+        return self.ready and as_aware(since) >= self._cutoff()
+
+    def _newer_than(self, since: datetime) -> List[LocationResponse]:
+        self._evict()
+        self.hits += 1
+        start = bisect.bisect_left(self._keys, (as_aware(since), -1))
+        return self._locations[start:][::-1]
+
+    def since(self, since: datetime) -> Optional[List[LocationResponse]]:
+        if not self.covers(since):
+            self.misses += 1
+            return None
+        return self._newer_than(since)
+
+    def in_last_hours(self, hours: int) -> Optional[List[LocationResponse]]:
+        if not self.ready or timedelta(hours=hours) > self.window:
+            self.misses += 1
+            return None
+        return self._newer_than(
+            datetime.now().astimezone() - timedelta(hours=hours)
+        )
+
+    def clusters(self, hours: int) -> Optional[ClusterIndex]:
+        if not self.ready or timedelta(hours=hours) > self.window:
+            return None
+
+        now = datetime.now().astimezone()
+        index = self._clusters.get(hours)
+        if index is None:
+            start = bisect.bisect_left(
+                self._keys, (now - timedelta(hours=hours), -1)
+            )
+            index = ClusterIndex(
+                timedelta(hours=hours),
+                radius=self.cluster_radius,
+                max_zoom=self.cluster_max_zoom,
+            )
+            for (post_time, _), location in zip(
+                self._keys[start:], self._locations[start:]
+            ):
+                index.add(location.id, post_time, location.lat, location.long)
+            self._clusters[hours] = index
+            while len(self._clusters) > self.cluster_cache_size:
+                self._clusters.popitem(last=False)
+        else:
+            self._clusters.move_to_end(hours)
+
+        index.evict(now)
+        return index
+
+    def state_in_last_hours(
+        self, hours: int
+    ) -> Optional[Tuple[int, Optional[datetime]]]:
+        if not self.ready or timedelta(hours=hours) > self.window:
+            return None
+
+        self._evict()
+        period = timedelta(hours=hours)
+        start = bisect.bisect_left(
+            self._keys, (datetime.now().astimezone() - period, -1)
+        )
+        aged_out = self._keys[start - 1][0] if start else self._evicted_until
+        return (
+            len(self._keys) - start,
+            aged_out + period if aged_out is not None else None,
+        )
+
+    async def warm(self, session_factory: Callable[[], AsyncSession]) -> None:
+        async with session_factory() as db:
+            locations = await LocationRepository(db).get_since_datetime(
+                self._cutoff()
+            )
+
+        entries = sorted(
+            [
+                ((as_aware(location.post_time), location.id), location)
+                for location in map(LocationResponse.model_validate, locations)
+                if location.id not in self._by_id
+            ]
+            + list(zip(self._keys, self._locations)),
+            key=lambda entry: entry[0],
+        )
+        self._keys = [key for key, _ in entries]
+        self._locations = [location for _, location in entries]
+        self._by_id = {key[1]: key for key in self._keys}
+        self._evict()
+        self.ready = True
+        logger.info(
+            "Hot window warmed with %d locations from the last %s",
+            len(self._locations),
+            self.window,
+        )
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._locations),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,209 @@
+import csv
+import io
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import msgpack
+import orjson
+from sqlalchemy import Row
+
+from backend.app.schemas.location import LocationResponse
+
+LocationRecord = Union[Row, LocationResponse]
+
+LOCATION_FIELDS = tuple(LocationResponse.model_fields)
+
+MEDIA_TYPES = {
+    "json": "application/json",
+    "geojson": "application/geo+json",
+    "columnar": "application/json",
+    "msgpack": "application/msgpack",
+}
+
+ACCEPTED_MEDIA_TYPES = {
+    "application/geo+json": "geojson",
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "geojsonseq": "application/geo+json-seq",
+}
+
+EXPORT_EXTENSIONS = {
+    "ndjson": "ndjson",
+    "csv": "csv",
+    "geojsonseq": "geojsons",
+}
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class OutputFormat(NamedTuple):
+    name: str
+    fields: Optional[Tuple[str, ...]]
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise ValueError(f"Unknown format '{requested}'")
+        return requested
+
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in ACCEPTED_MEDIA_TYPES:
+            return ACCEPTED_MEDIA_TYPES[media_type]
+    return "json"
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+
+    requested = tuple(
+        dict.fromkeys(
+            name.strip() for name in fields.split(",") if name.strip()
+        )
+    )
+    unknown = [name for name in requested if name not in LOCATION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def location_values(
+    location: LocationRecord, fields: Sequence[str]
+) -> Dict[str, Any]:
+    if isinstance(location, Row) and fields == LOCATION_FIELDS:
+        return location._asdict()
+    return {name: getattr(location, name) for name in fields}
+
+
+def to_records(
+    locations: Sequence[LocationRecord], fields: Sequence[str]
+) -> List[Dict[str, Any]]:
+    return [location_values(location, fields) for location in locations]
+
+
+def to_columnar(
+    locations: Sequence[LocationRecord], fields: Sequence[str]
+) -> Dict[str, Any]:
+    columns: Dict[str, Any] = {"count": len(locations)}
+    for name in fields:
+        columns[name] = [getattr(location, name) for location in locations]
+    return columns
+
+
+def format_datetime(value: datetime) -> str:
+    return orjson.dumps(value, option=JSON_OPTIONS)[1:-1].decode()
+
+
+def msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return format_datetime(value)
+    return value
+
+
+def to_geojson_features(
+    locations: Sequence[LocationRecord], fields: Sequence[str]
+) -> List[Dict[str, Any]]:
+    properties = [name for name in fields if name not in ("id", "lat", "long")]
+    return [
+        {
+            "type": "Feature",
+            "id": location.id,
+            "geometry": (
+                {
+                    "type": "Point",
+                    "coordinates": [location.long, location.lat],
+                }
+                if location.lat is not None and location.long is not None
+                else None
+            ),
+            "properties": location_values(location, properties),
+        }
+        for location in locations
+    ]
+
+
+def to_geojson(
+    locations: Sequence[LocationRecord], fields: Sequence[str]
+) -> Dict[str, Any]:
+    return {
+        "type": "FeatureCollection",
+        "features": to_geojson_features(locations, fields),
+    }
+
+
+def export_header(export_format: str, fields: Sequence[str]) -> bytes:
+    if export_format != "csv":
+        return b""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue().encode()
+
+
+def export_chunk(
+    locations: Sequence[LocationRecord],
+    export_format: str,
+    fields: Sequence[str],
+) -> bytes:
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [csv_value(getattr(location, name)) for name in fields]
+            for location in locations
+        )
+        return buffer.getvalue().encode()
+
+    if export_format == "geojsonseq":
+        return b"".join(
+            b"\x1e" + orjson.dumps(feature, option=JSON_OPTIONS) + b"\n"
+            for feature in to_geojson_features(locations, fields)
+        )
+
+    return b"".join(
+        orjson.dumps(record, option=JSON_OPTIONS) + b"\n"
+        for record in to_records(locations, fields)
+    )
+
+
+def render_locations(
+    locations: Sequence[LocationRecord], output_format: OutputFormat
+) -> Tuple[bytes, str]:
+    fields = output_format.fields or LOCATION_FIELDS
+    media_type = MEDIA_TYPES[output_format.name]
+
+    if output_format.name == "geojson":
+        payload = to_geojson(locations, fields)
+    elif output_format.name == "json":
+        payload = to_records(locations, fields)
+    else:
+        payload = to_columnar(locations, fields)
+
+    if output_format.name == "msgpack":
+        return (
+            msgpack.packb(payload, use_bin_type=True, default=msgpack_default),
+            media_type,
+        )
+    return orjson.dumps(payload, option=JSON_OPTIONS), media_type
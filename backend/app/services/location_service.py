@@ -1,8 +1,8 @@
 import logging
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from backend.app.repositories.location import LocationRepository
 from backend.app.schemas.location import (
@@ -10,60 +10,190 @@ from backend.app.schemas.location import (
     LocationUpdate,
     LocationResponse,
 )
+from backend.app.schemas.cluster import LocationCluster
+from backend.app.services.clusters import build_index
+from backend.app.services.hot_window import HotWindow
+from backend.app.services.location_formats import LocationRecord
+from backend.utils.converter import decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
 
+def hours_ago(hours: Optional[int]) -> Optional[datetime]:
+    return datetime.now() - timedelta(hours=hours) if hours else None
+
+
 class LocationService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: AsyncSession,
+        hot_window: Optional[HotWindow] = None,
+    ):
         self.repository = LocationRepository(db)
+        self.hot_window = hot_window
 
-    def get_location(self, location_id: int) -> Optional[LocationResponse]:
-        location = self.repository.get_by_id(location_id)
+    async def get_location(
+        self, location_id: int
+    ) -> Optional[LocationResponse]:
+        location = await self.repository.get_by_id(location_id)
         return LocationResponse.model_validate(location) if location else None
 
-    def get_locations(
+    async def get_locations(
         self, skip: int = 0, limit: int = 100
-    ) -> List[LocationResponse]:
-        locations = self.repository.get_all(skip=skip, limit=limit)
-        return [
-            LocationResponse.model_validate(location) for location in locations
-        ]
+    ) -> List[LocationRecord]:
+        locations = await self.repository.get_all(skip=skip, limit=limit)
+        return locations
+
+    async def get_locations_by_town(
+        self, town: str, skip: int = 0, limit: int = 100, match: str = "fuzzy"
+    ) -> List[LocationRecord]:
+        locations = await self.repository.get_by_town(
+            town, skip=skip, limit=limit, match=match
+        )
+        return locations
+
+    async def get_locations_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        town: Optional[str] = None,
+        match: str = "fuzzy",
+    ) -> Tuple[List[LocationRecord], Optional[str]]:
+        after = decode_cursor(cursor) if cursor else None
+        locations = await self.repository.get_page(
+            after=after, limit=limit + 1, town=town, match=match
+        )
 
-    def get_locations_by_town(
-        self, town: str, skip: int = 0, limit: int = 100
+        page = locations[:limit]
+        next_cursor = (
+            encode_cursor(page[-1].post_time, page[-1].id)
+            if len(locations) > limit
+            else None
+        )
+        return page, next_cursor
+
+    async def get_locations_after_id(
+        self, last_id: int, limit: int = 1000
     ) -> List[LocationResponse]:
-        locations = self.repository.get_by_town(town, skip=skip, limit=limit)
+        locations = await self.repository.get_after_id(last_id, limit=limit)
         return [
             LocationResponse.model_validate(location) for location in locations
         ]
 
-    def get_recent_locations(self, hours: int) -> List[LocationResponse]:
-        locations = self.repository.get_in_last_hours(hours)
-        return [
-            LocationResponse.model_validate(location) for location in locations
-        ]
+    async def get_recent_locations(self, hours: int) -> List[LocationRecord]:
+        if self.hot_window is not None:
+            cached = self.hot_window.in_last_hours(hours)
+            if cached is not None:
+                return cached
 
-    def get_locations_since(self, since: datetime) -> List[LocationResponse]:
-        locations = self.repository.get_since_datetime(since)
-        return [
-            LocationResponse.model_validate(location) for location in locations
-        ]
+        locations = await self.repository.get_in_last_hours(hours)
+        return locations
+
+    async def get_locations_since(
+        self, since: datetime
+    ) -> List[LocationRecord]:
+        if self.hot_window is not None:
+            cached = self.hot_window.since(since)
+            if cached is not None:
+                return cached
+
+        locations = await self.repository.get_since_datetime(since)
+        return locations
 
-    def create_location(
+    async def export_locations(
+        self,
+        since: datetime,
+        until: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[LocationRecord]]:
+        async for rows in self.repository.stream_between(
+            since, until=until, batch_size=batch_size
+        ):
+            yield rows
+
+    async def get_locations_in_bbox(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        hours: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[LocationRecord]:
+        locations = await self.repository.get_in_bbox(
+            min_lat,
+            min_lon,
+            max_lat,
+            max_lon,
+            since=hours_ago(hours),
+            limit=limit,
+        )
+        return locations
+
+    async def get_locations_near(
+        self,
+        lat: float,
+        lon: float,
+        radius_m: float,
+        hours: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[LocationRecord]:
+        locations = await self.repository.get_near(
+            lat, lon, radius_m, since=hours_ago(hours), limit=limit
+        )
+        return locations
+
+    async def get_location_clusters(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        zoom: int,
+        hours: int,
+        radius: float = 60,
+        max_zoom: int = 16,
+    ) -> List[LocationCluster]:
+        index = (
+            self.hot_window.clusters(hours)
+            if self.hot_window is not None
+            else None
+        )
+        if index is None:
+            index = build_index(
+                await self.repository.get_in_last_hours(hours),
+                timedelta(hours=hours),
+                radius=radius,
+                max_zoom=max_zoom,
+            )
+        return index.clusters(min_lat, min_lon, max_lat, max_lon, zoom)
+
+    async def create_location(
         self, location_data: LocationCreate
     ) -> LocationResponse:
-        location = self.repository.create(location_data)
-        return LocationResponse.model_validate(location)
+        location = await self.repository.create(location_data)
+        response = LocationResponse.model_validate(location)
+        if self.hot_window is not None:
+            self.hot_window.add(response)
+        return response
 
-    def update_location(
+    async def update_location(
         self, location_id: int, location_data: LocationUpdate
     ) -> Optional[LocationResponse]:
-        location = self.repository.update(location_id, location_data)
-        return LocationResponse.model_validate(location) if location else None
+        location = await self.repository.update(location_id, location_data)
+        if not location:
+            return None
+
+        response = LocationResponse.model_validate(location)
+        if self.hot_window is not None:
+            self.hot_window.add(response)
+        return response
 
-    def delete_location(self, location_id: int) -> bool:
-        return self.repository.delete(location_id)
+    async def delete_location(self, location_id: int) -> bool:
+        deleted = await self.repository.delete(location_id)
+        if deleted and self.hot_window is not None:
+            self.hot_window.discard(location_id)
+        return deleted
 
-    def get_location_count(self) -> int:
-        return self.repository.count()
+    async def get_location_count(self) -> int:
+        return await self.repository.count()
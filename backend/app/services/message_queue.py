@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import Row
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.metrics import QUEUE_WAIT_SECONDS, TimedQueue
+from backend.app.db.models.models import QueuedMessage
+from backend.app.repositories.message_queue import (
+    DEAD,
+    MessageQueueRepository,
+    utcnow,
+)
+from backend.app.services.tracing import MessageTrace
+
+logger = logging.getLogger(__name__)
+
+SETTLED_OUTCOMES = ("stored", "no_location")
+
+
+class MemoryMessageQueue(TimedQueue):
+    async def prepare(self) -> None:
+        pass
+
+    async def complete(self, trace: MessageTrace) -> None:
+        self.task_done()
+
+
+class DurableMessageQueue:
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        visibility_timeout: timedelta = timedelta(minutes=5),
+        max_attempts: int = 5,
+        retry_delay: timedelta = timedelta(seconds=30),
+        poll_interval: float = 1.0,
+    ):
+        self.session_factory = session_factory
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+
+        self._has_messages = asyncio.Event()
+        self._local: Dict[int, MessageTrace] = {}
+        self._in_flight: Dict[int, int] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._depth = 0
+
+        self.enqueued = 0
+        self.acked = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    def qsize(self) -> int:
+        return self._depth
+
+    async def prepare(self) -> None:
+        async with self.session_factory() as db:
+            connection = await db.connection()
+            await connection.run_sync(
+                QueuedMessage.__table__.create, checkfirst=True
+            )
+            await db.commit()
+
+    async def put(self, trace: MessageTrace) -> None:
+        async with self.session_factory() as db:
+            trace.queue_id = await MessageQueueRepository(db).enqueue(
+                trace.message, trace.trace_id
+            )
+        self._local[trace.queue_id] = trace
+        self._drained.clear()
+        self._depth += 1
+        self.enqueued += 1
+        self._has_messages.set()
+
+    def _delivery(self, row: Row) -> MessageTrace:
+        trace = self._local.get(row.id)
+        if trace is None:
+            enqueued_at = row.enqueued_at
+            if enqueued_at.tzinfo is None:
+                enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+            waited = max(0.0, (utcnow() - enqueued_at).total_seconds())
+
+            trace = MessageTrace(row.message, trace_id=row.trace_id)
+            trace.received_at = enqueued_at
+            trace.started = time.monotonic() - waited
+            trace.queue_id = row.id
+
+        trace.attempt = row.attempts
+        if trace.attempt == 1:
+            QUEUE_WAIT_SECONDS.observe(time.monotonic() - trace.started)
+        return trace
+
+    async def _claim(self) -> Optional[MessageTrace]:
+        async with self.session_factory() as db:
+            rows = await MessageQueueRepository(db).claim(
+                self.visibility_timeout, self.max_attempts
+            )
+        if not rows:
+            self._depth = 0
+            return None
+        self._depth = max(0, self._depth - 1)
+        return self._delivery(rows[0])
+
+    async def _extend_claims(self) -> None:
+        interval = self.visibility_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not self._in_flight:
+                continue
+            try:
+                async with self.session_factory() as db:
+                    await MessageQueueRepository(db).extend(
+                        list(self._in_flight.items()), self.visibility_timeout
+                    )
+            except SQLAlchemyError as e:
+                logger.warning(
+                    "Could not extend %d in-flight message claims: %s",
+                    len(self._in_flight),
+                    e,
+                )
+
+    async def get(self) -> MessageTrace:
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._extend_claims())
+
+        while True:
+            try:
+                trace = await self._claim()
+            except SQLAlchemyError:
+                trace = None
+            if trace is not None:
+                self._in_flight[trace.queue_id] = trace.attempt
+                return trace
+
+            self._has_messages.clear()
+            try:
+                await asyncio.wait_for(
+                    self._has_messages.wait(), timeout=self.poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _finish(self, trace: MessageTrace) -> None:
+        self._local.pop(trace.queue_id, None)
+        if not self._local:
+            self._drained.set()
+
+    async def complete(self, trace: MessageTrace) -> None:
+        self._in_flight.pop(trace.queue_id, None)
+        try:
+            async with self.session_factory() as db:
+                repository = MessageQueueRepository(db)
+                if trace.outcome in SETTLED_OUTCOMES:
+                    if await repository.ack(trace.queue_id, trace.attempt):
+                        self.acked += 1
+                    else:
+                        logger.warning(
+                            "Message %d (trace %s) was reclaimed before "
+                            "attempt %d finished, leaving it to the new claim",
+                            trace.queue_id,
+                            trace.trace_id,
+                            trace.attempt,
+                        )
+                    self._finish(trace)
+                    return
+
+                status = await repository.fail(
+                    trace.queue_id,
+                    trace.attempt,
+                    trace.outcome or "unknown",
+                    self.max_attempts,
+                    self.retry_delay,
+                )
+        except SQLAlchemyError as e:
+            logger.error(
+                "Could not settle queued message %d, it will be redelivered "
+                "after the visibility timeout: %s",
+                trace.queue_id,
+                e,
+            )
+            return
+
+        if status == DEAD:
+            logger.warning(
+                "Message %d (trace %s) dead-lettered after %d attempts",
+                trace.queue_id,
+                trace.trace_id,
+                trace.attempt,
+            )
+            self.dead_lettered += 1
+            self._finish(trace)
+        elif status is not None:
+            self.retried += 1
+
+    async def join(self) -> None:
+        await self._drained.wait()
+
+    async def stats(self) -> Dict[str, Any]:
+        async with self.session_factory() as db:
+            counts = await MessageQueueRepository(db).counts()
+        return {
+            "pending": counts.get("pending", 0),
+            "processing": counts.get("processing", 0),
+            "dead": counts.get("dead", 0),
+            "enqueued": self.enqueued,
+            "acked": self.acked,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    async def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        async with self.session_factory() as db:
+            rows = await MessageQueueRepository(db).get_dead(limit)
+        return [row._asdict() for row in rows]
+
+    async def retry_dead(
+        self, message_ids: Optional[Sequence[int]] = None
+    ) -> int:
+        async with self.session_factory() as db:
+            requeued = await MessageQueueRepository(db).retry_dead(message_ids)
+        if requeued:
+            self._has_messages.set()
+        return requeued
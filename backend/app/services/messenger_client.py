@@ -1,11 +1,18 @@
+import asyncio
 import logging
 from asyncio import Queue
 from typing import Optional
 
 from fbchat_muqit import Client, Message, ThreadType
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.app.services.tracing import MessageTrace
 
 logger = logging.getLogger(__name__)
 
+ENQUEUE_ATTEMPTS = 5
+ENQUEUE_RETRY_DELAY = 0.5
+
 
 class MessengerClient(Client):
     _process_queue: Optional[Queue]
@@ -45,4 +52,31 @@ class MessengerClient(Client):
             message = message_object.text
             logger.info("Received message: %s", message)
             if self._process_queue:
-                await self._process_queue.put(message)
+                await self._enqueue(MessageTrace(message))
+
+    async def _enqueue(self, trace: MessageTrace) -> None:
+        for attempt in range(1, ENQUEUE_ATTEMPTS + 1):
+            try:
+                await self._process_queue.put(trace)
+                return
+            except SQLAlchemyError as e:
+                if attempt == ENQUEUE_ATTEMPTS:
+                    logger.error(
+                        "Dropping message after %d failed enqueue attempts: "
+                        "%r (%s)",
+                        attempt,
+                        trace.message,
+                        e,
+                    )
+                    return
+
+                delay = ENQUEUE_RETRY_DELAY * 2 ** (attempt - 1)
+                logger.warning(
+                    "Could not enqueue message (attempt %d/%d), retrying "
+                    "in %.1fs: %s",
+                    attempt,
+                    ENQUEUE_ATTEMPTS,
+                    delay,
+                    e,
+                )
+                await asyncio.sleep(delay)
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from backend.app.services.parser import Parser
+
+logger = logging.getLogger(__name__)
+
+
+class ParseBatcher:
+    def __init__(
+        self, parser: Parser, max_batch_size: int = 8, max_wait: float = 0.05
+    ):
+        self.parser = parser
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._has_pending = asyncio.Event()
+        self._batch_full = asyncio.Event()
+        self._collector: Optional[asyncio.Task] = None
+        self._batches: set = set()
+
+        self.batches_sent = 0
+        self.fallbacks = 0
+
+    async def parse(self, message: str) -> Optional[dict]:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((message, future))
+        self._has_pending.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_full.set()
+
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self._collect())
+
+        return await future
+
+    async def _collect(self) -> None:
+        while True:
+            await self._has_pending.wait()
+            try:
+                await asyncio.wait_for(
+                    self._batch_full.wait(), timeout=self.max_wait
+                )
+            except asyncio.TimeoutError:
+                pass
+
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            if not self._pending:
+                self._has_pending.clear()
+            if len(self._pending) < self.max_batch_size:
+                self._batch_full.clear()
+
+            task = asyncio.create_task(self._run(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        messages = [message for message, _ in batch]
+        try:
+            if len(batch) == 1:
+                results = [await self.parser.aparse_message(messages[0])]
+            else:
+                self.batches_sent += 1
+                logger.info("Parsing batch of %d messages", len(batch))
+                results = await self.parser.aparse_batch(messages)
+
+            failed = [i for i, result in enumerate(results) if result is None]
+            if len(batch) > 1 and failed:
+                self.fallbacks += len(failed)
+                logger.warning(
+                    "%d of %d batched messages fell back to single parsing",
+                    len(failed),
+                    len(batch),
+                )
+                retried = await asyncio.gather(
+                    *(self.parser.aparse_message(messages[i]) for i in failed)
+                )
+                for i, result in zip(failed, retried):
+                    results[i] = result
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
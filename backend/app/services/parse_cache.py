@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_message(message: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", (message or "").casefold()).split())
+
+
+def shingles(normalized: str, size: int = 3) -> Set[str]:
+    result = set()
+    for token in normalized.split():
+        padded = f" {token} "
+        if len(padded) <= size:
+            result.add(padded)
+            continue
+        for start in range(len(padded) - size + 1):
+            result.add(padded[start : start + size])
+    return result
+
+
+class NearDuplicateIndex:
+    def __init__(
+        self, num_perm: int = 64, bands: int = 16, threshold: float = 0.85
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        rng = random.Random(num_perm)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], Set[str]]] = [
+            {} for _ in range(bands)
+        ]
+
+    def signature(self, normalized: str) -> Optional[Tuple[int, ...]]:
+        hashed = [
+            int.from_bytes(
+                hashlib.blake2b(s.encode(), digest_size=8).digest(), "big"
+            )
+            for s in shingles(normalized)
+        ]
+        if not hashed:
+            return None
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashed)
+            for a, b in self._permutations
+        )
+
+    def _bands(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows : (band + 1) * self.rows]
+
+    def add(self, key: str) -> None:
+        signature = self.signature(key)
+        if signature is None or key in self._signatures:
+            return
+        self._signatures[key] = signature
+        for band, rows in self._bands(signature):
+            self._buckets[band].setdefault(rows, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, rows in self._bands(signature):
+            bucket = self._buckets[band].get(rows)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band][rows]
+
+    def query(self, key: str) -> Optional[str]:
+        signature = self.signature(key)
+        if signature is None:
+            return None
+
+        candidates: Set[str] = set()
+        for band, rows in self._bands(signature):
+            candidates |= self._buckets[band].get(rows, set())
+
+        best_key, best_score = None, self.threshold
+        for candidate in candidates:
+            other = self._signatures[candidate]
+            score = (
+                sum(x == y for x, y in zip(signature, other)) / self.num_perm
+            )
+            if score >= best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def clear(self) -> None:
+        self._signatures.clear()
+        for bucket in self._buckets:
+            bucket.clear()
+
+
+class CachedParse(NamedTuple):
+    result: dict
+    stored_at: float
+
+
+class ParseCache:
+    def __init__(
+        self,
+        max_size: int = 2048,
+        ttl: float = 24 * 3600,
+        near_duplicates: Optional[NearDuplicateIndex] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+
+        self._entries: "OrderedDict[str, CachedParse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _drop(self, key: str) -> None:
+        del self._entries[key]
+        if self.near_duplicates:
+            self.near_duplicates.remove(key)
+
+    def _fresh(self, key: Optional[str]) -> Optional[CachedParse]:
+        if key is None:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at > self.ttl:
+            self._drop(key)
+            return None
+        return entry
+
+    def get(self, message: str) -> Optional[dict]:
+        key = normalize_message(message)
+        with self._lock:
+            entry = self._fresh(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry.result)
+
+            if self.near_duplicates:
+                match = self.near_duplicates.query(key)
+                entry = self._fresh(match)
+                if entry is not None:
+                    logger.info(
+                        "Reusing parse of near-duplicate message: %s", match
+                    )
+                    self.near_hits += 1
+                    return dict(entry.result)
+
+            self.misses += 1
+            return None
+
+    def set(self, message: str, result: dict) -> None:
+        key = normalize_message(message)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = CachedParse(dict(result), time.monotonic())
+            if self.near_duplicates:
+                self.near_duplicates.add(key)
+
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.near_duplicates:
+                self.near_duplicates.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+        }
@@ -1,11 +1,39 @@
+import asyncio
 import json
 import logging
-from typing import Optional
+import random
+from typing import List, Optional
 
-from openai import OpenAI
+import httpx
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    AsyncOpenAI,
+    OpenAI,
+)
+
+from backend.app.core.metrics import LLM_PARSE_SECONDS, LLM_TOKENS
+from backend.app.services.parse_cache import ParseCache
 
 logger = logging.getLogger(__name__)
 
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+DEFAULT_HEADERS = {
+    "HTTP-Referer": "https://github.com",
+    "X-Title": "Parse Agent",
+}
+
+
+BATCH_INSTRUCTIONS = """
+
+• Batch mode:
+  - The user message is a JSON array of objects {"index": <int>, "message": <text>}.
+  - Apply the rules above to every message independently.
+  - Output must be a JSON object {"results": [...]} with exactly one entry per input message: {"index": <same index>, "town": <town>, "street": <street>}.
+  - If a message has no meaningful location information, use empty strings for "town" and "street".
+"""
+
 
 class Parser:
     def __init__(
@@ -13,55 +41,255 @@ class Parser:
         open_router_api_key: str,
         system_prompt: str,
         model: str,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        max_concurrency: int = 8,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        parse_cache: Optional[ParseCache] = None,
     ):
         self.client = OpenAI(
             api_key=open_router_api_key,
-            base_url="https://openrouter.ai/api/v1",
-            default_headers={
-                "HTTP-Referer": "https://github.com",
-                "X-Title": "Parse Agent",
-            },
+            base_url=OPENROUTER_BASE_URL,
+            default_headers=DEFAULT_HEADERS,
+            timeout=timeout,
+            max_retries=max_retries,
+        )
+
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            timeout=timeout,
+        )
+        self.async_client = AsyncOpenAI(
+            api_key=open_router_api_key,
+            base_url=OPENROUTER_BASE_URL,
+            default_headers=DEFAULT_HEADERS,
+            http_client=self._http_client,
+            timeout=timeout,
+            max_retries=0,
         )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
 
         self.model = model
         self.system_prompt = system_prompt
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.parse_cache = parse_cache
+
+    def _build_messages(self, message: str) -> list:
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": message},
+        ]
+
+    def _decode_reply(self, response) -> Optional[dict]:
+        if (
+            not response
+            or not hasattr(response, "choices")
+            or not response.choices
+        ):
+            logger.error("Invalid response: missing choices")
+            return None
+
+        parased_reply = response.choices[0].message.content
+
+        if not parased_reply:
+            raise Exception("Empty reply from chat api")
+
+        return json.loads(parased_reply)
+
+    def _cached(self, message: str) -> Optional[dict]:
+        if self.parse_cache is None:
+            return None
+        return self.parse_cache.get(message)
+
+    def _remember(self, message: str, parsed: Optional[dict]) -> None:
+        if self.parse_cache is not None and parsed is not None:
+            self.parse_cache.set(message, parsed)
 
     def parse_message(
         self, message: str, temperature: float = 0.1
     ) -> Optional[dict]:
+        cached = self._cached(message)
+        if cached is not None:
+            return cached
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": message},
-                ],
+                messages=self._build_messages(message),
                 temperature=temperature,
                 response_format={"type": "json_object"},
             )
 
+            parsed = self._decode_reply(response)
+            self._remember(message, parsed)
+            return parsed
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            return None
+
+    async def aparse_message(
+        self, message: str, temperature: float = 0.1
+    ) -> Optional[dict]:
+        cached = self._cached(message)
+        if cached is not None:
+            return cached
+
+        try:
+            response = await self._complete(
+                "single",
+                model=self.model,
+                messages=self._build_messages(message),
+                temperature=temperature,
+                response_format={"type": "json_object"},
+            )
+
+            parsed = self._decode_reply(response)
+            self._remember(message, parsed)
+            return parsed
+        except Exception as e:
+            logger.error(f"Error: {e}")
+            return None
+
+    def _decode_batch_reply(self, response, size: int) -> List[Optional[dict]]:
+        results: List[Optional[dict]] = [None] * size
+
+        reply = self._decode_reply(response)
+        items = reply.get("results") if isinstance(reply, dict) else None
+        if not isinstance(items, list):
+            logger.error("Invalid batch reply: missing results array")
+            return results
+
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.get("index")
+            town = item.get("town", "")
+            street = item.get("street", "")
             if (
-                not response
-                or not hasattr(response, "choices")
-                or not response.choices
+                not isinstance(index, int)
+                or not 0 <= index < size
+                or not isinstance(town, str)
+                or not isinstance(street, str)
             ):
-                logger.error("Invalid response: missing choices")
-                return None
-
-            parased_reply = response.choices[0].message.content
+                continue
+            results[index] = (
+                {"town": town, "street": street} if town or street else {}
+            )
+        return results
 
-            if not parased_reply:
-                raise Exception("Empty reply from chat api")
+    async def aparse_batch(
+        self, messages: List[str], temperature: float = 0.1
+    ) -> List[Optional[dict]]:
+        results = [self._cached(message) for message in messages]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
 
-            parased_reply = json.loads(parased_reply)
+        try:
+            response = await self._complete(
+                "batch",
+                model=self.model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": self.system_prompt + BATCH_INSTRUCTIONS,
+                    },
+                    {
+                        "role": "user",
+                        "content": json.dumps(
+                            [
+                                {"index": index, "message": messages[i]}
+                                for index, i in enumerate(pending)
+                            ],
+                            ensure_ascii=False,
+                        ),
+                    },
+                ],
+                temperature=temperature,
+                response_format={"type": "json_object"},
+            )
 
-            return parased_reply
+            parsed = self._decode_batch_reply(response, len(pending))
         except Exception as e:
             logger.error(f"Error: {e}")
-            return None
+            return results
+
+        for i, result in zip(pending, parsed):
+            results[i] = result
+            self._remember(messages[i], result)
+        return results
+
+    async def _complete(self, kind: str, **kwargs):
+        with LLM_PARSE_SECONDS.time(kind=kind):
+            response = await self._create_with_retries(**kwargs)
+
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(usage.prompt_tokens or 0, type="prompt")
+            LLM_TOKENS.inc(usage.completion_tokens or 0, type="completion")
+        return response
+
+    async def _create_with_retries(self, **kwargs):
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    return await self.async_client.chat.completions.create(
+                        timeout=self.timeout, **kwargs
+                    )
+            except (APIConnectionError, APIStatusError) as e:
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    raise
+
+                delay = self._backoff_delay(attempt, e)
+                attempt += 1
+                logger.warning(
+                    "Chat API call failed (%s), retry %d/%d in %.2fs",
+                    e,
+                    attempt,
+                    self.max_retries,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, APIConnectionError)
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        ceiling = min(self.backoff_max, self.backoff_base * 2**attempt)
+        delay = random.uniform(0, ceiling)
+
+        if isinstance(error, APIStatusError):
+            retry_after = error.response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    delay = max(
+                        delay, min(float(retry_after), self.backoff_max)
+                    )
+            except ValueError:
+                pass
+
+        return delay
+
+    async def aclose(self) -> None:
+        await self.async_client.close()
 
     def update_system_prompt(self, new_prompt: str) -> None:
         self.system_prompt = new_prompt
+        if self.parse_cache is not None:
+            self.parse_cache.clear()
 
     def change_model(self, new_model: str) -> None:
         self.model = new_model
+        if self.parse_cache is not None:
+            self.parse_cache.clear()
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+Stack = Tuple[str, ...]
+
+IDLE_FUNCTIONS = {"select", "poll", "epoll", "kqueue", "control"}
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return (
+        f"{os.path.basename(code.co_filename)}:{code.co_name}:"
+        f"{frame.f_lineno}"
+    )
+
+
+def frame_stack(frame, max_depth: int = 128) -> Stack:
+    stack: List[str] = []
+    while frame is not None and len(stack) < max_depth:
+        stack.append(frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class ProfileResult:
+    def __init__(
+        self, stacks: Counter, samples: int, duration: float, interval: float
+    ):
+        self.stacks = stacks
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+
+    def idle_samples(self) -> int:
+        return sum(
+            count
+            for stack, count in self.stacks.items()
+            if stack and stack[-1].split(":")[1] in IDLE_FUNCTIONS
+        )
+
+    def top(self, limit: int = 25) -> List[Dict[str, Any]]:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            if not stack:
+                continue
+            own[stack[-1].rsplit(":", 1)[0]] += count
+            for function in {label.rsplit(":", 1)[0] for label in stack}:
+                total[function] += count
+
+        return [
+            {
+                "function": function,
+                "own": count,
+                "total": total[function],
+                "own_pct": round(100 * count / self.samples, 2),
+                "total_pct": round(100 * total[function] / self.samples, 2),
+            }
+            for function, count in own.most_common(limit)
+        ]
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in self.stacks.most_common()
+        )
+
+    def as_dict(self, limit: int = 25) -> Dict[str, Any]:
+        return {
+            "duration": round(self.duration, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples(),
+            "top": self.top(limit) if self.samples else [],
+        }
+
+
+class LoopProfiler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    @staticmethod
+    def _sample(
+        thread_id: int,
+        interval: float,
+        stop: threading.Event,
+        stacks: Counter,
+    ) -> None:
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                stacks[frame_stack(frame)] += 1
+
+    async def profile(
+        self, seconds: float, interval: Optional[float] = None
+    ) -> ProfileResult:
+        interval = interval or self.interval
+        async with self._lock:
+            stacks: Counter = Counter()
+            stop = threading.Event()
+            sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(), interval, stop, stacks),
+                name="loop-profiler",
+                daemon=True,
+            )
+
+            started = time.monotonic()
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                stop.set()
+                await asyncio.to_thread(sampler.join)
+
+            return ProfileResult(
+                stacks,
+                sum(stacks.values()),
+                time.monotonic() - started,
+                interval,
+            )
@@ -1,9 +1,17 @@
+import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Awaitable, Callable, Dict, Optional, Tuple
 from venv import logger
 
+from backend.app.core.metrics import GEOCODE_SECONDS
 from backend.app.schemas.location import LocationCreate
+from backend.app.services.fast_extractor import LocationExtractor
+from backend.app.services.gazetteer import Gazetteer
+from backend.app.services.geocode_cache import Coordinates, GeocodeCache
+from backend.app.services.geocoder import GeocodingService
+from backend.app.services.parse_batcher import ParseBatcher
 from backend.app.services.parser import Parser
+from backend.app.services.tracing import MessageTrace
 from geopy.geocoders import Nominatim
 
 # from backend.app.db.models.models import Location
@@ -11,73 +19,281 @@ from geopy.geocoders import Nominatim
 logger = logging.getLogger(__name__)
 
 
+class ParseError(Exception):
+    pass
+
+
 class RecordCreator:
-    def __init__(self, agent: Parser, general_location: str, db_session=None):
+    def __init__(
+        self,
+        agent: Parser,
+        general_location: str,
+        db_session=None,
+        geocode_cache: Optional[GeocodeCache] = None,
+        gazetteer: Optional[Gazetteer] = None,
+        geocoding_service: Optional[GeocodingService] = None,
+        extractor: Optional[LocationExtractor] = None,
+        min_fast_path_confidence: float = 0.8,
+        batcher: Optional[ParseBatcher] = None,
+    ):
         self.agent = agent
         self.geolocator = Nominatim(user_agent="Antiradar")
         self.general_location = general_location
         self.db_session = db_session
+        self.geocode_cache = geocode_cache
+        self.gazetteer = gazetteer
+        self.geocoding_service = geocoding_service
+        self.extractor = extractor
+        self.min_fast_path_confidence = min_fast_path_confidence
+        self.batcher = batcher
+
+    def _fast_path(self, message: str) -> Optional[Dict]:
+        if self.extractor is None:
+            return None
+
+        extraction = self.extractor.extract(message)
+        if extraction.confidence < self.min_fast_path_confidence:
+            return None
+
+        logger.info(
+            "Fast path extracted %s (confidence %.2f)",
+            extraction.as_dict(),
+            extraction.confidence,
+        )
+        return extraction.as_dict()
 
     def _parse_msg(self, message: str) -> Optional[Dict]:
         try:
+            extracted = self._fast_path(message)
+            if extracted:
+                return extracted
+
             parsed = self.agent.parse_message(message)
             return parsed
         except Exception as e:
             logger.error("Error parsing message: %s", e)
             return None
 
-    def _geocode(self, town: str, street: str) -> Optional[object]:
-        try:
-            address = (
-                f"{street} {town} {self.general_location}"
-                if town and street
-                else town or street
+    def _address(self, town: str, street: str) -> str:
+        return (
+            f"{street} {town} {self.general_location}"
+            if town and street
+            else town or street
+        )
+
+    def _from_gazetteer(
+        self, town: str, street: str, address: str
+    ) -> Optional[Coordinates]:
+        if not self.gazetteer:
+            return None
+        entry = self.gazetteer.resolve(town, street)
+        if entry is None:
+            return None
+        logger.info("Resolved %s from gazetteer: %s", address, entry)
+        return Coordinates(entry.latitude, entry.longitude)
+
+    def _cache_key(self, town: str, street: str) -> str:
+        return self.geocode_cache.make_key(
+            town, street, self.general_location
+        )
+
+    def _log_cache_hit(self, address: str, cached) -> None:
+        logger.info(
+            "Geocode cache hit for %s: %s", address, cached.coordinates
+        )
+
+    def _lookup(
+        self, town: str, street: str, address: str
+    ) -> Tuple[bool, Optional[Coordinates]]:
+        coordinates = self._from_gazetteer(town, street, address)
+        if coordinates:
+            return True, coordinates
+
+        if self.geocode_cache:
+            cached = self.geocode_cache.peek(self._cache_key(town, street))
+            if cached:
+                self._log_cache_hit(address, cached)
+                return True, cached.coordinates
+
+        return False, None
+
+    async def _lookup_async(
+        self, town: str, street: str, address: str
+    ) -> Tuple[bool, Optional[Coordinates]]:
+        coordinates = self._from_gazetteer(town, street, address)
+        if coordinates:
+            return True, coordinates
+
+        if self.geocode_cache:
+            cached = await self.geocode_cache.get(
+                self._cache_key(town, street)
+            )
+            if cached:
+                self._log_cache_hit(address, cached)
+                return True, cached.coordinates
+
+        return False, None
+
+    def _remember(
+        self, town: str, street: str, coordinates: Optional[Coordinates]
+    ) -> None:
+        if self.geocode_cache:
+            self.geocode_cache.remember(
+                self._cache_key(town, street), coordinates
             )
+
+    async def _remember_async(
+        self, town: str, street: str, coordinates: Optional[Coordinates]
+    ) -> None:
+        if self.geocode_cache:
+            await self.geocode_cache.set(
+                self._cache_key(town, street), coordinates
+            )
+
+    def _geocode(self, town: str, street: str) -> Optional[Coordinates]:
+        try:
+            address = self._address(town, street)
             if not address:
                 return None
 
+            found, coordinates = self._lookup(town, street, address)
+            if found:
+                return coordinates
+
             logger.info("Geocoding address: %s", address)
 
-            coordinates = self.geolocator.geocode(address)
-            logger.info("Geocoded address: %s", coordinates)
+            location = self.geolocator.geocode(address)
+            logger.info("Geocoded address: %s", location)
+
+            coordinates = (
+                Coordinates(location.latitude, location.longitude)
+                if location
+                else None
+            )
+            self._remember(town, street, coordinates)
             return coordinates
         except Exception as e:
             logger.info("Error geocoding address: %s", e)
             return None
 
-    def create_record(self, message: str) -> Optional[LocationCreate]:
+    async def _geocode_async(
+        self, town: str, street: str, received_at: Optional[float] = None
+    ) -> Optional[Coordinates]:
+        if self.geocoding_service is None:
+            return await asyncio.to_thread(self._geocode, town, street)
+
+        try:
+            address = self._address(town, street)
+            if not address:
+                return None
+
+            with GEOCODE_SECONDS.time(source="local"):
+                found, coordinates = await self._lookup_async(
+                    town, street, address
+                )
+            if found:
+                return coordinates
+
+            with GEOCODE_SECONDS.time(source="nominatim"):
+                coordinates = await self.geocoding_service.geocode(
+                    address, received_at
+                )
+            logger.info("Geocoded address %s: %s", address, coordinates)
+
+            await self._remember_async(town, street, coordinates)
+            return coordinates
+        except Exception as e:
+            logger.info("Error geocoding address: %s", e)
+            return None
+
+    async def _parse_msg_async(self, message: str) -> Dict:
+        try:
+            extracted = self._fast_path(message)
+            if extracted:
+                return extracted
+
+            if self.batcher:
+                parsed = await self.batcher.parse(message)
+            else:
+                parsed = await self.agent.aparse_message(message)
+        except Exception as e:
+            raise ParseError(f"Error parsing message: {e}") from e
+
+        if parsed is None:
+            raise ParseError("Parser returned no result")
+        return parsed
+
+    def _build_record(
+        self, message: str, location_data: Dict, coordinates
+    ) -> LocationCreate:
         latitude = None
         longitude = None
-        town = ""
-        street = ""
 
+        town = location_data.get("town", "")
+        street = location_data.get("street", "")
+
+        if coordinates:
+            latitude = coordinates.latitude  # type: ignore
+            longitude = coordinates.longitude  # type: ignore
+        else:
+            logger.warning(
+                f"Could not geocode: Town='{town}', Street='{street}'"
+            )
+
+        return LocationCreate(
+            town=town,
+            street=street,
+            lat=latitude,
+            long=longitude,
+            message=message,
+        )
+
+    def create_record(self, message: str) -> Optional[LocationCreate]:
         try:
             location_data = self._parse_msg(message)
             if not location_data:
                 logger.warning("Failed to parse message: %s", message)
                 return None
 
-            town = location_data.get("town", "")
-            street = location_data.get("street", "")
+            coordinates = self._geocode(
+                location_data.get("town", ""), location_data.get("street", "")
+            )
+            return self._build_record(message, location_data, coordinates)
 
-            coordinates = self._geocode(town, street)
-            if coordinates:
-                latitude = coordinates.latitude  # type: ignore
-                longitude = coordinates.longitude  # type: ignore
-            else:
-                logger.warning(
-                    f"Could not geocode: Town='{town}', Street='{street}'"
-                )
+        except Exception as e:
+            logger.error(
+                "Error creating Location record: %s", e, exc_info=True
+            )
+            return None
+
+    async def create_record_async(
+        self,
+        message: str,
+        received_at: Optional[float] = None,
+        trace: Optional[MessageTrace] = None,
+        on_parsed: Optional[Callable[[Dict], Awaitable[None]]] = None,
+    ) -> Optional[LocationCreate]:
+        try:
+            location_data = await self._parse_msg_async(message)
+            if trace:
+                trace.mark("parsed")
+            if not location_data:
+                logger.info("No location in message: %s", message)
+                return None
+            if on_parsed:
+                await on_parsed(location_data)
 
-            location = LocationCreate(
-                town=town,
-                street=street,
-                lat=latitude,
-                long=longitude,
-                message=message,
+            coordinates = await self._geocode_async(
+                location_data.get("town", ""),
+                location_data.get("street", ""),
+                received_at,
             )
-            return location
+            if trace:
+                trace.mark("geocoded")
+            return self._build_record(message, location_data, coordinates)
 
+        except ParseError:
+            raise
         except Exception as e:
             logger.error(
                 "Error creating Location record: %s", e, exc_info=True
@@ -0,0 +1,99 @@
+import heapq
+import itertools
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+
+class MessageTrace:
+    def __init__(self, message: str, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.message = message
+        self.received_at = datetime.now(timezone.utc)
+        self.started = time.monotonic()
+        self.stages: List[Tuple[str, float]] = [("received", 0.0)]
+        self.outcome: Optional[str] = None
+        self.location_id: Optional[int] = None
+        self.duration: Optional[float] = None
+        self.queue_id: Optional[int] = None
+        self.attempt = 1
+
+    def mark(self, stage: str) -> None:
+        self.stages.append((stage, time.monotonic() - self.started))
+
+    def finish(self, outcome: str, location_id: Optional[int] = None) -> None:
+        self.outcome = outcome
+        self.location_id = location_id
+        self.duration = time.monotonic() - self.started
+
+    def as_dict(self) -> Dict[str, Any]:
+        previous = 0.0
+        stages = []
+        for stage, offset in self.stages:
+            stages.append(
+                {
+                    "stage": stage,
+                    "at_ms": round(offset * 1000, 3),
+                    "took_ms": round((offset - previous) * 1000, 3),
+                }
+            )
+            previous = offset
+
+        return {
+            "trace_id": self.trace_id,
+            "received_at": self.received_at.isoformat(),
+            "duration_ms": (
+                round(self.duration * 1000, 3)
+                if self.duration is not None
+                else None
+            ),
+            "outcome": self.outcome,
+            "attempt": self.attempt,
+            "location_id": self.location_id,
+            "message": self.message,
+            "stages": stages,
+        }
+
+
+class TraceBuffer:
+    def __init__(self, size: int = 50):
+        self.size = size
+        self._slowest: List[Tuple[float, int, MessageTrace]] = []
+        self._recent: Deque[MessageTrace] = deque(maxlen=size)
+        self._order = itertools.count()
+
+        self.recorded = 0
+
+    def record(self, trace: MessageTrace) -> None:
+        if trace.duration is None:
+            trace.finish(trace.outcome or "unknown")
+        self.recorded += 1
+        self._recent.append(trace)
+
+        entry = (trace.duration, next(self._order), trace)
+        if len(self._slowest) < self.size:
+            heapq.heappush(self._slowest, entry)
+        elif entry[0] > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest(self, limit: Optional[int] = None) -> List[MessageTrace]:
+        traces = [trace for _, _, trace in sorted(self._slowest, reverse=True)]
+        return traces[:limit]
+
+    def recent(self, limit: Optional[int] = None) -> List[MessageTrace]:
+        traces = list(reversed(self._recent))
+        return traces[:limit]
+
+    def get(self, trace_id: str) -> Optional[MessageTrace]:
+        for trace in itertools.chain(
+            self._recent, (trace for _, _, trace in self._slowest)
+        ):
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+    def clear(self) -> None:
+        self._slowest.clear()
+        self._recent.clear()
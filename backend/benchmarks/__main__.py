@@ -0,0 +1,244 @@
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+
+PROFILE_HELP = (
+    "instant, fast, realistic, degraded or mean_ms[,jitter_ms[,error_rate]]"
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m backend.benchmarks",
+        description="Offline benchmarks for the ingestion pipeline and API.",
+    )
+    arg_parser.add_argument(
+        "--database-url",
+        help="Scratch database the benchmark writes to; its tables are "
+        "dropped and recreated (default: a temporary SQLite file)",
+    )
+    arg_parser.add_argument(
+        "--reuse-database",
+        action="store_true",
+        help="Keep rows and caches from earlier runs in --database-url",
+    )
+    arg_parser.add_argument("--json", help="Write the result to this file")
+    arg_parser.add_argument(
+        "--baseline", help="Earlier --json result to compare against"
+    )
+    arg_parser.add_argument("--verbose", action="store_true")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    pipeline = commands.add_parser(
+        "pipeline",
+        help="Replay messages through RecordCreator and message_handler",
+    )
+    pipeline.add_argument("--messages", type=int, default=500)
+    pipeline.add_argument(
+        "--corpus", help="Text (one message per line) or NDJSON corpus"
+    )
+    pipeline.add_argument("--duplicate-rate", type=float, default=0.1)
+    pipeline.add_argument(
+        "--chatter-rate",
+        type=float,
+        default=0.2,
+        help="Share of generated messages that carry no location",
+    )
+    pipeline.add_argument("--workers", type=int, default=4)
+    pipeline.add_argument(
+        "--rate",
+        type=float,
+        help="Arrival rate in messages/s (default: enqueue as one burst)",
+    )
+    pipeline.add_argument("--llm", default="realistic", help=PROFILE_HELP)
+    pipeline.add_argument("--geocoder", default="realistic", help=PROFILE_HELP)
+    pipeline.add_argument(
+        "--queue",
+        choices=("memory", "database"),
+        default="database",
+        help="MESSAGE_QUEUE_BACKEND to replay through",
+    )
+    pipeline.add_argument("--llm-batch-size", type=int, default=1)
+    pipeline.add_argument(
+        "--geocode-rate",
+        type=float,
+        default=50.0,
+        help="Geocoder requests/s (Nominatim allows 1)",
+    )
+    pipeline.add_argument(
+        "--no-fast-path",
+        action="store_true",
+        help="Send every message to the LLM stand-in",
+    )
+    pipeline.add_argument("--seed", type=int, default=1)
+
+    api = commands.add_parser(
+        "api", help="Load the routers/locations.py endpoints"
+    )
+    api.add_argument("--requests", type=int, default=200)
+    api.add_argument("--concurrency", type=int, default=8)
+    api.add_argument(
+        "--seed-locations",
+        type=int,
+        default=0,
+        help="Insert this many synthetic locations first",
+    )
+    api.add_argument(
+        "--url", help="Benchmark a running server instead of in-process"
+    )
+    api.add_argument(
+        "--scenario",
+        action="append",
+        help="Only run this scenario (repeatable)",
+    )
+    return arg_parser
+
+
+def run(args: argparse.Namespace):
+    if args.command == "pipeline":
+        from backend.benchmarks.corpus import generate_corpus, load_corpus
+        from backend.benchmarks.pipeline import run_pipeline
+        from backend.benchmarks.stubs import (
+            GEOCODER_PROFILES,
+            LLM_PROFILES,
+            parse_profile,
+        )
+
+        corpus = (
+            load_corpus(args.corpus, args.messages)
+            if args.corpus
+            else generate_corpus(
+                args.messages,
+                args.duplicate_rate,
+                chatter_rate=args.chatter_rate,
+                seed=args.seed,
+            )
+        )
+        return asyncio.run(
+            run_pipeline(
+                corpus,
+                workers=args.workers,
+                llm=parse_profile(args.llm, LLM_PROFILES),
+                geocoder=parse_profile(args.geocoder, GEOCODER_PROFILES),
+                rate=args.rate,
+                llm_batch_size=args.llm_batch_size,
+                geocode_rate=args.geocode_rate,
+                fast_path=not args.no_fast_path,
+                seed=args.seed,
+            )
+        )
+
+    from backend.benchmarks.api import run_api
+
+    return asyncio.run(
+        run_api(
+            requests=args.requests,
+            concurrency=args.concurrency,
+            url=args.url,
+            only=args.scenario,
+            seed_count=args.seed_locations,
+        )
+    )
+
+
+def reset_database() -> None:
+    from backend.app.db.database import engine
+    from backend.app.db.models.models import Base
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def print_report(result, baseline) -> None:
+    from backend.benchmarks.report import compare, format_table
+
+    latency_columns = ["count", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    if result["benchmark"] == "pipeline":
+        print(
+            f"{result['config']['messages']} messages in "
+            f"{result['elapsed_s']:.2f}s: "
+            f"{result['messages_per_s']:.2f} messages/s, "
+            f"{result['db_round_trips_per_message']:.2f} "
+            "DB round trips/message"
+        )
+        print(
+            f"outcomes: {result['outcomes']}  "
+            f"llm calls: {result['llm_calls']} "
+            f"({result['llm_errors']} failed)  "
+            f"geocoder calls: {result['geocoder_calls']} "
+            f"({result['geocoder_errors']} failed)"
+        )
+        rows = [result["latency"], *result["stages"]]
+        print(format_table(rows, ["stage", *latency_columns]))
+        if baseline:
+            metrics = ["p50_ms", "p95_ms", "p99_ms"]
+            print("\nchange vs baseline:")
+            print(
+                format_table(
+                    compare(
+                        rows,
+                        [baseline["latency"], *baseline["stages"]],
+                        "stage",
+                        metrics,
+                    ),
+                    ["stage", *metrics],
+                )
+            )
+        return
+
+    columns = [
+        "scenario",
+        "requests_per_s",
+        "errors",
+        *latency_columns,
+        "db_round_trips_per_request",
+    ]
+    print(format_table(result["scenarios"], columns))
+    if baseline:
+        metrics = ["requests_per_s", "p50_ms", "p95_ms", "p99_ms"]
+        print("\nchange vs baseline:")
+        print(
+            format_table(
+                compare(
+                    result["scenarios"],
+                    baseline["scenarios"],
+                    "scenario",
+                    metrics,
+                ),
+                ["scenario", *metrics],
+            )
+        )
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR)
+
+    scratch_dir = None
+    if args.database_url is None:
+        scratch_dir = tempfile.mkdtemp(prefix="antiradar-benchmark-")
+        args.database_url = f"sqlite:///{scratch_dir}/benchmark.db"
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("OPEN_ROUTER_API", "benchmark")
+    os.environ.setdefault("FB_CREDENTIALS_PATH", "benchmark")
+    os.environ.setdefault("QUEUE_RETRY_DELAY_SECONDS", "0")
+    if args.command == "pipeline":
+        os.environ["MESSAGE_QUEUE_BACKEND"] = args.queue
+
+    from backend.benchmarks.report import read_json, write_json
+
+    try:
+        if not getattr(args, "url", None) and not args.reuse_database:
+            reset_database()
+        baseline = read_json(args.baseline)
+        result = run(args)
+    finally:
+        if scratch_dir:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    print_report(result, baseline)
+    if args.json:
+        write_json(args.json, result)
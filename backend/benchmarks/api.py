@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from backend.app.core.dependencies import hot_window
+from backend.app.db.database import AsyncSessionMaker, async_engine, engine
+from backend.app.db.models.models import Base
+from backend.app.schemas.location import LocationCreate
+from backend.app.services.bulk_writer import LocationBulkWriter
+from backend.benchmarks.corpus import generate_corpus
+from backend.benchmarks.report import RoundTripCounter, summarize
+from backend.benchmarks.stubs import DEFAULT_COORDINATES
+
+logger = logging.getLogger(__name__)
+
+CENTER_LAT, CENTER_LON = DEFAULT_COORDINATES
+
+
+def scenarios() -> List[Tuple[str, str]]:
+    since = (datetime.now() - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%S")
+    return [
+        ("list", "/locations/?limit=100"),
+        ("list_town", "/locations/?town=Zielona&match=prefix&limit=100"),
+        ("recent", "/locations/query/recent?hours=24"),
+        ("recent_geojson", "/locations/query/recent?hours=24&format=geojson"),
+        ("since", f"/locations/query/since/{since}"),
+        (
+            "near",
+            f"/locations/query/near?lat={CENTER_LAT}&lon={CENTER_LON}"
+            "&radius_m=2000",
+        ),
+        (
+            "bbox",
+            "/locations/query/bbox?min_lat=51.90&min_lon=15.45"
+            "&max_lat=51.97&max_lon=15.56",
+        ),
+        ("clusters", "/locations/clusters?bbox=15.3,51.8,15.7,52.05&zoom=12"),
+        ("heatmap", "/locations/stats/heatmap?precision=6"),
+    ]
+
+
+async def seed_locations(count: int, seed: int = 1) -> int:
+    Base.metadata.create_all(bind=engine)
+
+    rng = random.Random(seed)
+    locations = [
+        LocationCreate(
+            town=message.town,
+            street=message.street,
+            lat=CENTER_LAT + rng.uniform(-0.05, 0.05),
+            long=CENTER_LON + rng.uniform(-0.08, 0.08),
+            message=message.text,
+        )
+        for message in generate_corpus(
+            count, duplicate_rate=0, chatter_rate=0, seed=seed
+        )
+    ]
+    copied = await LocationBulkWriter(AsyncSessionMaker).copy(locations)
+    logger.info("Seeded %d locations", copied)
+    return copied
+
+
+async def drive(
+    client: httpx.AsyncClient, path: str, requests: int, concurrency: int
+) -> Tuple[List[float], int, float]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = itertools.repeat(None, requests)
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                await response.aread()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_api(
+    requests: int = 200,
+    concurrency: int = 8,
+    url: Optional[str] = None,
+    only: Optional[Sequence[str]] = None,
+    seed_count: int = 0,
+) -> Dict[str, Any]:
+    if seed_count:
+        await seed_locations(seed_count)
+
+    if url:
+        client = httpx.AsyncClient(base_url=url, timeout=60)
+    else:
+        from backend.app.main import app
+
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        if hot_window is not None:
+            await hot_window.warm(AsyncSessionMaker)
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://benchmark",
+            timeout=60,
+        )
+
+    results = []
+    try:
+        async with client:
+            for name, path in scenarios():
+                if only and name not in only:
+                    continue
+                await client.get(path)
+
+                with RoundTripCounter(async_engine.sync_engine) as round_trips:
+                    latencies, errors, elapsed = await drive(
+                        client, path, requests, concurrency
+                    )
+                results.append(
+                    {
+                        "scenario": name,
+                        "requests_per_s": len(latencies) / elapsed,
+                        "errors": errors,
+                        **summarize(latencies),
+                        "db_round_trips_per_request": (
+                            round_trips.count / len(latencies)
+                            if not url
+                            else None
+                        ),
+                    }
+                )
+    finally:
+        await async_engine.dispose()
+
+    return {
+        "benchmark": "api",
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "target": url or "in-process",
+            "database": engine.dialect.name,
+        },
+        "scenarios": results,
+    }
@@ -0,0 +1,154 @@
+import json
+import random
+from typing import Dict, List, NamedTuple, Optional
+
+from backend.app.core.config import DEFAULT_TOWN, KNOWN_TOWNS
+
+STREETS = (
+    "Wojska Polskiego",
+    "Zjednoczenia",
+    "Batorego",
+    "Sulechowska",
+    "Trasa Północna",
+    "Energetyków",
+    "Botaniczna",
+    "Dąbrówki",
+    "Kożuchowska",
+    "Chrobrego",
+    "Lwowska",
+    "Podgórna",
+    "Wrocławska",
+    "Łużycka",
+    "Dworcowa",
+    "Bohaterów Westerplatte",
+    "Piastowska",
+    "Szosa Kisielińska",
+    "Objazdowa",
+    "Ptasia",
+)
+
+LANDMARKS = (
+    "Iveco",
+    "Focus Mall",
+    "Dino",
+    "Lidl",
+    "Orlen",
+    "Palmiarnia",
+    "NBP",
+    "Biedronka",
+)
+
+DIRECTIONS = (
+    "centrum",
+    "Sulechowa",
+    "Zielonej Góry",
+    "obwodnicy",
+    "S3",
+    "Nowej Soli",
+)
+
+TEMPLATES = (
+    "Suszą na {street}",
+    "{street} suszą w stronę {direction}",
+    "Uwaga kontrola prędkości {town} ul. {street}",
+    "Radar na {street} przy {landmark}",
+    "Nieoznakowane BMW na {street}, {town}",
+    "Stoją na {street}, uważajcie",
+    "Drogówka {town} {street} z laserem",
+    "Laser na {street} od strony {direction}",
+    "Przed {landmark} na {street} stoją",
+    "Kontrola trzeźwości {street} {town}",
+    "potwierdzam, dalej stoją na {street}",
+    "{street} za {landmark} suszarka",
+)
+
+TOWN_ONLY_TEMPLATES = (
+    "Wjazd do {town} stoją",
+    "{town} suszą przy wjeździe",
+    "Policja w {town} na rondzie",
+)
+
+
+CHATTER = (
+    "Dzięki za info!",
+    "Ktoś wie, czy dalej stoją?",
+    "Już pojechali",
+    "Czysto",
+    "Ok, dzięki",
+    "Jak tam sytuacja?",
+    "Uważajcie na siebie",
+    "Można jechać?",
+    "Dobranoc wszystkim",
+    "Ktoś sprzedaje opony zimowe?",
+)
+
+
+class CorpusMessage(NamedTuple):
+    text: str
+    town: str
+    street: str
+
+    def expected(self) -> Dict[str, str]:
+        if not self.town and not self.street:
+            return {}
+        return {"town": self.town, "street": self.street}
+
+
+def mentioned_town(text: str) -> str:
+    lowered = text.lower()
+    for town in KNOWN_TOWNS:
+        if town.lower() in lowered:
+            return town
+    return ""
+
+
+def generate_corpus(
+    size: int,
+    duplicate_rate: float = 0.1,
+    town_only_rate: float = 0.1,
+    chatter_rate: float = 0.2,
+    seed: int = 1,
+) -> List[CorpusMessage]:
+    rng = random.Random(seed)
+    corpus: List[CorpusMessage] = []
+    for _ in range(size):
+        if corpus and rng.random() < duplicate_rate:
+            corpus.append(rng.choice(corpus))
+            continue
+        if rng.random() < chatter_rate:
+            corpus.append(CorpusMessage(rng.choice(CHATTER), "", ""))
+            continue
+
+        town = DEFAULT_TOWN if rng.random() < 0.7 else rng.choice(KNOWN_TOWNS)
+        values = {
+            "town": town,
+            "street": rng.choice(STREETS),
+            "landmark": rng.choice(LANDMARKS),
+            "direction": rng.choice(DIRECTIONS),
+        }
+        if rng.random() < town_only_rate:
+            text = rng.choice(TOWN_ONLY_TEMPLATES).format(**values)
+            corpus.append(CorpusMessage(text, town, ""))
+        else:
+            text = rng.choice(TEMPLATES).format(**values)
+            corpus.append(CorpusMessage(text, town, values["street"]))
+    return corpus
+
+
+def load_corpus(path: str, limit: Optional[int] = None) -> List[CorpusMessage]:
+    corpus: List[CorpusMessage] = []
+    with open(path, encoding="utf-8") as corpus_file:
+        for line in corpus_file:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                street = record.get("street") or ""
+                town = record.get("town") or (DEFAULT_TOWN if street else "")
+                corpus.append(CorpusMessage(record["message"], town, street))
+            else:
+                corpus.append(CorpusMessage(line, mentioned_town(line), ""))
+            if limit and len(corpus) >= limit:
+                break
+    return corpus
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from backend.app.core.config import settings
+from backend.app.db.database import async_engine, engine
+from backend.app.db.models.models import Base
+from backend.app.services import async_runner
+from backend.app.services.geocoder import GeocodingService
+from backend.app.services.parse_batcher import ParseBatcher
+from backend.app.services.parser import Parser
+from backend.app.services.record_creator import RecordCreator
+from backend.app.services.tracing import MessageTrace
+from backend.benchmarks.corpus import CorpusMessage
+from backend.benchmarks.report import RoundTripCounter, summarize
+from backend.benchmarks.stubs import (
+    LatencyProfile,
+    StubChatClient,
+    StubCompletions,
+    StubGeolocator,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def stage_latencies(traces: List[MessageTrace]) -> Dict[str, List[float]]:
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for trace in traces:
+        previous = 0.0
+        for stage, offset in trace.stages[1:]:
+            stages[stage].append(offset - previous)
+            previous = offset
+    return stages
+
+
+async def replay(
+    corpus: List[CorpusMessage], workers: int, rate: Optional[float]
+) -> List[MessageTrace]:
+    traces = [MessageTrace(message.text) for message in corpus]
+    handlers = [
+        asyncio.create_task(async_runner.message_handler(worker_id))
+        for worker_id in range(workers)
+    ]
+
+    started = time.monotonic()
+    try:
+        for sent, trace in enumerate(traces):
+            if rate:
+                await asyncio.sleep(
+                    max(0.0, started + sent / rate - time.monotonic())
+                )
+                trace.started = time.monotonic()
+            await async_runner.message_queue.put(trace)
+
+        await async_runner.message_queue.join()
+    finally:
+        for handler in handlers:
+            handler.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+    return traces
+
+
+async def run_pipeline(
+    corpus: List[CorpusMessage],
+    workers: int = settings.PIPELINE_WORKERS,
+    llm: LatencyProfile = LatencyProfile(0),
+    geocoder: LatencyProfile = LatencyProfile(0),
+    rate: Optional[float] = None,
+    llm_batch_size: int = 1,
+    geocode_rate: float = 50.0,
+    fast_path: bool = True,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    Base.metadata.create_all(bind=engine)
+
+    completions = StubCompletions(llm, corpus, seed=seed)
+    parser = Parser(
+        open_router_api_key="benchmark",
+        system_prompt=settings.SYSTEM_PROMPT,
+        model=settings.MODEL,
+        timeout=settings.LLM_TIMEOUT,
+        max_retries=settings.LLM_MAX_RETRIES,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        parse_cache=async_runner.parse_cache,
+    )
+    parser.async_client = StubChatClient(completions)
+
+    geolocator = StubGeolocator(geocoder, seed=seed)
+    geocoding_service = GeocodingService(
+        rate=geocode_rate, burst=max(1, int(geocode_rate))
+    )
+    geocoding_service.geolocator = geolocator
+
+    async_runner.record_creator = RecordCreator(
+        parser,
+        settings.GENERAL_LOCATION,
+        geocode_cache=async_runner.geocode_cache,
+        gazetteer=async_runner.gazetteer,
+        geocoding_service=geocoding_service,
+        extractor=async_runner.extractor if fast_path else None,
+        min_fast_path_confidence=settings.FAST_PATH_MIN_CONFIDENCE,
+        batcher=(
+            ParseBatcher(
+                parser,
+                max_batch_size=llm_batch_size,
+                max_wait=settings.LLM_BATCH_WAIT_MS / 1000,
+            )
+            if llm_batch_size > 1
+            else None
+        ),
+    )
+
+    try:
+        with RoundTripCounter(engine, async_engine.sync_engine) as round_trips:
+            started = time.perf_counter()
+            traces = await replay(corpus, workers, rate)
+            elapsed = time.perf_counter() - started
+            await async_runner.bulk_writer.flush()
+    finally:
+        await parser.aclose()
+        await geocoding_service.close()
+        await async_runner.bulk_writer.close()
+        await async_engine.dispose()
+
+    stages = [
+        {"stage": stage, **summarize(latencies)}
+        for stage, latencies in stage_latencies(traces).items()
+    ]
+    return {
+        "benchmark": "pipeline",
+        "config": {
+            "messages": len(corpus),
+            "workers": workers,
+            "rate": rate,
+            "llm": llm._asdict(),
+            "geocoder": geocoder._asdict(),
+            "queue": settings.MESSAGE_QUEUE_BACKEND,
+            "llm_batch_size": llm_batch_size,
+            "geocode_rate": geocode_rate,
+            "fast_path": fast_path,
+            "database": engine.dialect.name,
+        },
+        "elapsed_s": elapsed,
+        "messages_per_s": len(traces) / elapsed if elapsed else 0.0,
+        "latency": {
+            "stage": "total",
+            **summarize([t.duration for t in traces]),
+        },
+        "stages": stages,
+        "outcomes": dict(Counter(trace.outcome for trace in traces)),
+        "db_round_trips": round_trips.count,
+        "db_round_trips_per_message": round_trips.count / len(traces),
+        "llm_calls": completions.calls,
+        "llm_errors": completions.errors,
+        "geocoder_calls": geolocator.calls,
+        "geocoder_errors": geolocator.errors,
+    }
@@ -0,0 +1,110 @@
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(latencies: Sequence[float]) -> Dict[str, float]:
+    return {
+        "count": len(latencies),
+        "mean_ms": (
+            1000 * sum(latencies) / len(latencies) if latencies else math.nan
+        ),
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99),
+        "max_ms": 1000 * max(latencies) if latencies else math.nan,
+    }
+
+
+class RoundTripCounter:
+    def __init__(self, *engines: Engine):
+        self.engines = engines
+        self.count = 0
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+    def __enter__(self) -> "RoundTripCounter":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._count)
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, float):
+        return "-" if math.isnan(value) else f"{value:.2f}"
+    return str(value)
+
+
+def format_table(rows: List[Dict[str, Any]], columns: Sequence[str]) -> str:
+    cells = [
+        [format_value(row.get(column, "")) for column in columns]
+        for row in rows
+    ]
+    widths = [
+        max(len(column), *(len(row[i]) for row in cells))
+        for i, column in enumerate(columns)
+    ]
+    lines = [
+        "  ".join(
+            column.ljust(width) for column, width in zip(columns, widths)
+        )
+    ]
+    lines.append("  ".join("-" * width for width in widths))
+    for row in cells:
+        lines.append(
+            "  ".join(
+                cell.rjust(width) if i else cell.ljust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            )
+        )
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def compare(
+    rows: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    key: str,
+    metrics: Sequence[str],
+) -> List[Dict[str, Any]]:
+    previous = {row[key]: row for row in baseline}
+    compared = []
+    for row in rows:
+        before = previous.get(row[key], {})
+        delta = {key: row[key]}
+        for metric in metrics:
+            old, new = before.get(metric), row.get(metric)
+            if isinstance(old, (int, float)) and old and new is not None:
+                delta[metric] = f"{100 * (new - old) / old:+.1f}%"
+            else:
+                delta[metric] = "n/a"
+        compared.append(delta)
+    return compared
+
+
+def write_json(path: str, result: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as result_file:
+        json.dump(result, result_file, indent=2, default=str)
+
+
+def read_json(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as result_file:
+        return json.load(result_file)
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+from typing import Dict, Iterable, NamedTuple, Optional
+
+import httpx
+from geopy.exc import GeocoderUnavailable
+from openai import APIStatusError
+
+from backend.benchmarks.corpus import CorpusMessage
+
+STUB_URL = "http://benchmark.invalid/v1/chat/completions"
+
+DEFAULT_COORDINATES = (51.9356, 15.5062)
+
+
+class LatencyProfile(NamedTuple):
+    mean_ms: float
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def delay(self, rng: random.Random) -> float:
+        if self.mean_ms <= 0:
+            return 0.0
+        return max(0.0, rng.gauss(self.mean_ms, self.jitter_ms)) / 1000
+
+    def fails(self, rng: random.Random) -> bool:
+        return rng.random() < self.error_rate
+
+
+LLM_PROFILES = {
+    "instant": LatencyProfile(0),
+    "fast": LatencyProfile(80, 20),
+    "realistic": LatencyProfile(900, 400, 0.02),
+    "degraded": LatencyProfile(3000, 1500, 0.15),
+}
+
+GEOCODER_PROFILES = {
+    "instant": LatencyProfile(0),
+    "fast": LatencyProfile(20, 5),
+    "realistic": LatencyProfile(250, 120, 0.01),
+    "degraded": LatencyProfile(1500, 800, 0.1),
+}
+
+
+def parse_profile(value: str, presets: Dict[str, LatencyProfile]):
+    if value in presets:
+        return presets[value]
+    try:
+        parts = [float(part) for part in value.split(",")]
+        return LatencyProfile(*parts)
+    except (TypeError, ValueError):
+        raise ValueError(
+            f"Expected one of {', '.join(presets)} or "
+            f"'mean_ms[,jitter_ms[,error_rate]]', got '{value}'"
+        )
+
+
+def stub_reply(content: Dict, prompt: str) -> SimpleNamespace:
+    reply = json.dumps(content, ensure_ascii=False)
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=reply))],
+        usage=SimpleNamespace(
+            prompt_tokens=len(prompt) // 4,
+            completion_tokens=len(reply) // 4,
+        ),
+    )
+
+
+class StubCompletions:
+    def __init__(
+        self,
+        profile: LatencyProfile,
+        corpus: Iterable[CorpusMessage],
+        seed: int = 1,
+    ):
+        self.profile = profile
+        self._expected = {
+            message.text: message.expected() for message in corpus
+        }
+        self._rng = random.Random(seed)
+
+        self.calls = 0
+        self.errors = 0
+
+    def _answer(self, message: str) -> Dict[str, str]:
+        return self._expected.get(message, {})
+
+    async def create(self, timeout: Optional[float] = None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.profile.delay(self._rng))
+        if self.profile.fails(self._rng):
+            self.errors += 1
+            response = httpx.Response(
+                503, request=httpx.Request("POST", STUB_URL)
+            )
+            raise APIStatusError(
+                "Stub upstream unavailable", response=response, body=None
+            )
+
+        prompt = kwargs["messages"][-1]["content"]
+        if '"index"' in prompt and prompt.startswith("["):
+            results = [
+                {"index": item["index"], **self._answer(item["message"])}
+                for item in json.loads(prompt)
+            ]
+            return stub_reply({"results": results}, prompt)
+        return stub_reply(self._answer(prompt), prompt)
+
+
+class StubChatClient:
+    def __init__(self, completions: StubCompletions):
+        self.chat = SimpleNamespace(completions=completions)
+
+    async def close(self) -> None:
+        pass
+
+
+class StubGeolocator:
+    def __init__(self, profile: LatencyProfile, seed: int = 1):
+        self.profile = profile
+        self._rng = random.Random(seed)
+
+        self.calls = 0
+        self.errors = 0
+
+    async def geocode(self, address: str):
+        self.calls += 1
+        await asyncio.sleep(self.profile.delay(self._rng))
+        if self.profile.fails(self._rng):
+            self.errors += 1
+            raise GeocoderUnavailable("Stub geocoder unavailable")
+
+        offset = (hash(address) % 2000) / 100000
+        return SimpleNamespace(
+            latitude=DEFAULT_COORDINATES[0] + offset,
+            longitude=DEFAULT_COORDINATES[1] - offset,
+        )
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import json
+import logging
+
+from backend.app.db.database import AsyncSessionMaker, async_engine
+from backend.app.schemas.location import LocationImport
+from backend.app.services.bulk_writer import LocationBulkWriter
+from backend.app.services.change_tracker import ChangeTracker
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(path: str, chunk_size: int) -> int:
+    with open(path, encoding="utf-8") as backfill_file:
+        locations = [
+            LocationImport.model_validate(json.loads(line))
+            for line in backfill_file
+            if line.strip()
+        ]
+
+    try:
+        await ChangeTracker().prepare(AsyncSessionMaker)
+        copied = await LocationBulkWriter(AsyncSessionMaker).copy(
+            locations, chunk_size=chunk_size
+        )
+    finally:
+        await async_engine.dispose()
+
+    logger.info("Backfilled %d locations from %s", copied, path)
+    return copied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = argparse.ArgumentParser(
+        description="Bulk load locations from a newline-delimited JSON file."
+    )
+    arg_parser.add_argument("ndjson")
+    arg_parser.add_argument("--chunk-size", type=int, default=10000)
+    args = arg_parser.parse_args()
+
+    asyncio.run(backfill(args.ndjson, args.chunk_size))
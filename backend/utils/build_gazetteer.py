@@ -0,0 +1,135 @@
+import argparse
+import csv
+import gzip
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils.geohash import haversine_m
+
+logger = logging.getLogger(__name__)
+
+PLACE_TYPES = {"city", "town", "village", "suburb", "quarter", "hamlet"}
+
+# Rough extent of a settlement around its place node, used to pick the town
+# of a street without addr:city: a street 4 km from a city centre belongs to
+# the city rather than to a village 1.5 km away.
+SETTLEMENT_RADIUS_M = {"city": 8000.0, "town": 3000.0, "village": 1200.0}
+MAX_SETTLEMENT_DISTANCE = 2.0
+MAX_SPREAD_M = 3000.0
+
+
+def element_coordinates(element: dict):
+    if "lat" in element and "lon" in element:
+        return element["lat"], element["lon"]
+    center = element.get("center")
+    if center:
+        return center["lat"], center["lon"]
+    return None
+
+
+def nearest_settlement(
+    settlements: List[Tuple[str, float, float, float]],
+    coordinates: Tuple[float, float],
+) -> Optional[str]:
+    best_name = None
+    best_distance = MAX_SETTLEMENT_DISTANCE
+    for name, latitude, longitude, radius in settlements:
+        distance = (
+            haversine_m(coordinates[0], coordinates[1], latitude, longitude)
+            / radius
+        )
+        if distance <= best_distance:
+            best_name, best_distance = name, distance
+    return best_name
+
+
+def centroid(coordinates: List[Tuple[float, float]]) -> Tuple[float, float]:
+    return (
+        sum(lat for lat, _ in coordinates) / len(coordinates),
+        sum(lon for _, lon in coordinates) / len(coordinates),
+    )
+
+
+def spread_m(coordinates: List[Tuple[float, float]]) -> float:
+    latitude, longitude = centroid(coordinates)
+    return max(
+        haversine_m(latitude, longitude, lat, lon) for lat, lon in coordinates
+    )
+
+
+def convert(overpass_path: str, output_path: str, default_town: str) -> int:
+    with open(overpass_path, encoding="utf-8") as overpass_file:
+        elements = json.load(overpass_file).get("elements", [])
+
+    settlements = []
+    for element in elements:
+        tags = element.get("tags", {})
+        coordinates = element_coordinates(element)
+        radius = SETTLEMENT_RADIUS_M.get(tags.get("place"))
+        if tags.get("name") and coordinates and radius:
+            settlements.append((tags["name"], *coordinates, radius))
+
+    points: Dict[Tuple[str, str, str], List[Tuple[float, float]]] = (
+        defaultdict(list)
+    )
+    for element in elements:
+        tags = element.get("tags", {})
+        name = tags.get("name")
+        coordinates = element_coordinates(element)
+        if not name or not coordinates:
+            continue
+
+        if tags.get("place") in PLACE_TYPES:
+            points[(name, name, "town")].append(coordinates)
+        else:
+            town = (
+                tags.get("addr:city")
+                or nearest_settlement(settlements, coordinates)
+                or default_town
+            )
+            kind = "street" if "highway" in tags else "poi"
+            points[(town, name, kind)].append(coordinates)
+
+    written = 0
+    opener = gzip.open if output_path.endswith(".gz") else open
+    with opener(output_path, "wt", encoding="utf-8", newline="") as output:
+        writer = csv.writer(output, delimiter="\t", lineterminator="\n")
+        output.write("# town\tname\tkind\tlat\tlon\n")
+        for (town, name, kind), coordinates in sorted(points.items()):
+            spread = spread_m(coordinates)
+            if kind != "town" and spread > MAX_SPREAD_M:
+                logger.warning(
+                    "Skipping ambiguous %s %s in %s: %d matches up to "
+                    "%.0f m from their centre",
+                    kind,
+                    name,
+                    town,
+                    len(coordinates),
+                    spread,
+                )
+                continue
+            latitude, longitude = centroid(coordinates)
+            writer.writerow(
+                [town, name, kind, f"{latitude:.6f}", f"{longitude:.6f}"]
+            )
+            written += 1
+
+    logger.info("Wrote %d gazetteer entries to %s", written, output_path)
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    arg_parser = argparse.ArgumentParser(
+        description="Convert an Overpass JSON export (out center;) into "
+        "the tab-separated gazetteer read by GAZETTEER_PATH."
+    )
+    arg_parser.add_argument("overpass_json")
+    arg_parser.add_argument("output", help="*.tsv or *.tsv.gz")
+    arg_parser.add_argument("--default-town", default="Zielona Góra")
+    args = arg_parser.parse_args()
+
+    convert(args.overpass_json, args.output, args.default_town)
@@ -1,4 +1,7 @@
+import base64
+import json
 from datetime import datetime
+from typing import Tuple
 
 
 def string_to_datetime(date_string, format_string="%Y-%m-%dT%H:%M:%S"):
@@ -6,3 +9,17 @@ def string_to_datetime(date_string, format_string="%Y-%m-%dT%H:%M:%S"):
         return datetime.strptime(date_string, format_string)
     except ValueError as e:
         raise ValueError(f"Error converting '{date_string}' to datetime: {e}")
+
+
+def encode_cursor(post_time: datetime, location_id: int) -> str:
+    payload = json.dumps([post_time.isoformat(), location_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        post_time, location_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(post_time), int(location_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor '{cursor}': {e}")
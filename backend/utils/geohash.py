@@ -0,0 +1,128 @@
+import math
+from typing import List, Optional, Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+EARTH_RADIUS_M = 6371008.8
+
+METERS_PER_DEGREE = 111320.0
+
+
+def encode(lat: float, lon: float, precision: int = 9) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+
+    while len(chars) < precision:
+        coordinate_range, coordinate = (
+            (lon_range, lon) if even else (lat_range, lat)
+        )
+        middle = (coordinate_range[0] + coordinate_range[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            coordinate_range[0] = middle
+        else:
+            coordinate_range[1] = middle
+
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+
+    return "".join(chars)
+
+
+def decode(geohash: str) -> Tuple[float, float]:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = BASE32.index(char)
+        for bit in range(4, -1, -1):
+            coordinate_range = lon_range if even else lat_range
+            middle = (coordinate_range[0] + coordinate_range[1]) / 2
+            if value >> bit & 1:
+                coordinate_range[0] = middle
+            else:
+                coordinate_range[1] = middle
+            even = not even
+
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = math.floor(precision * 5 / 2)
+    return 180.0 / 2**lat_bits, 360.0 / 2**lon_bits
+
+
+def covering_cells(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    max_cells: int = 16,
+) -> List[str]:
+    for precision in range(9, 0, -1):
+        height, width = cell_size(precision)
+        lat_start = math.floor((min_lat + 90) / height)
+        lat_end = math.floor((max_lat + 90) / height)
+        lon_start = math.floor((min_lon + 180) / width)
+        lon_end = math.floor((max_lon + 180) / width)
+
+        if (lat_end - lat_start + 1) * (lon_end - lon_start + 1) > max_cells:
+            continue
+
+        return sorted(
+            {
+                encode(
+                    (lat_index + 0.5) * height - 90,
+                    (lon_index + 0.5) * width - 180,
+                    precision,
+                )
+                for lat_index in range(lat_start, lat_end + 1)
+                for lon_index in range(lon_start, lon_end + 1)
+            }
+        )
+    return []
+
+
+def prefix_range(prefix: str) -> Tuple[str, Optional[str]]:
+    stripped = prefix.rstrip(BASE32[-1])
+    if not stripped:
+        return prefix, None
+    upper = stripped[:-1] + BASE32[BASE32.index(stripped[-1]) + 1]
+    return prefix, upper
+
+
+def radius_bbox(
+    lat: float, lon: float, radius_m: float
+) -> Tuple[float, float, float, float]:
+    lat_delta = radius_m / METERS_PER_DEGREE
+    lon_delta = radius_m / (
+        METERS_PER_DEGREE * max(math.cos(math.radians(lat)), 1e-6)
+    )
+    return (
+        max(lat - lat_delta, -90.0),
+        max(lon - lon_delta, -180.0),
+        min(lat + lat_delta, 90.0),
+        min(lon + lon_delta, 180.0),
+    )
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
@@ -0,0 +1,177 @@
+import logging
+from collections import Counter
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, insert, inspect, select, text, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from backend.app.core.config import settings
+from backend.app.db.database import SessionMaker, engine
+from backend.app.db.models.models import Base, HeatmapBucket, Location
+from backend.app.repositories.heatmap import bucket_keys
+from backend.app.repositories.location import (
+    location_geohash,
+    location_town_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def add_missing_columns() -> None:
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing = {
+            column["name"] for column in inspector.get_columns(table.name)
+        }
+        with engine.begin() as connection:
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN {column.name} {column_type}"
+                    )
+                )
+                logger.info("Added column %s.%s", table.name, column.name)
+
+
+def create_missing_indexes() -> None:
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def create_trigram_index() -> None:
+    if engine.dialect.name != "postgresql":
+        return
+
+    try:
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            connection.execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_locations_town_key_trgm "
+                    "ON locations USING gin (town_key gin_trgm_ops)"
+                )
+            )
+    except SQLAlchemyError as e:
+        logger.warning(
+            "pg_trgm unavailable, fuzzy town search will scan: %s", e
+        )
+
+
+def backfill_geohashes(batch_size: int = 1000) -> None:
+    with SessionMaker() as db:
+        while True:
+            rows = db.execute(
+                select(Location.id, Location.lat, Location.long)
+                .filter(
+                    Location.geohash.is_(None),
+                    Location.lat.is_not(None),
+                    Location.long.is_not(None),
+                )
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            db.execute(
+                update(Location),
+                [
+                    {
+                        "id": row.id,
+                        "geohash": location_geohash(row.lat, row.long),
+                    }
+                    for row in rows
+                ],
+            )
+            db.commit()
+            logger.info("Backfilled geohash for %d locations", len(rows))
+
+
+def backfill_town_keys(batch_size: int = 1000) -> None:
+    with SessionMaker() as db:
+        while True:
+            rows = db.execute(
+                select(Location.id, Location.town)
+                .filter(
+                    Location.town_key.is_(None),
+                    Location.town.is_not(None),
+                )
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+
+            db.execute(
+                update(Location),
+                [
+                    {"id": row.id, "town_key": location_town_key(row.town)}
+                    for row in rows
+                ],
+            )
+            db.commit()
+            logger.info("Backfilled town key for %d locations", len(rows))
+
+
+def backfill_heatmap(batch_size: int = 1000) -> None:
+    with SessionMaker() as db:
+        if db.scalar(select(func.count()).select_from(HeatmapBucket)):
+            return
+
+        timezone = ZoneInfo(settings.HEATMAP_TIMEZONE)
+        counts = Counter()
+        rows = db.execute(
+            select(Location.lat, Location.long, Location.post_time)
+            .filter(Location.lat.is_not(None), Location.long.is_not(None))
+            .execution_options(yield_per=batch_size)
+        )
+        for row in rows:
+            counts.update(
+                bucket_keys(
+                    row.lat,
+                    row.long,
+                    row.post_time,
+                    settings.HEATMAP_PRECISIONS,
+                    timezone,
+                )
+            )
+        if not counts:
+            return
+
+        db.execute(
+            insert(HeatmapBucket),
+            [
+                {
+                    "precision": precision,
+                    "cell": cell,
+                    "weekday": weekday,
+                    "hour": hour,
+                    "count": count,
+                }
+                for (precision, cell, weekday, hour), count in counts.items()
+            ],
+        )
+        db.commit()
+        logger.info("Backfilled %d heatmap buckets", len(counts))
+
+
+def init_db() -> None:
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    create_missing_indexes()
+    create_trigram_index()
+    backfill_geohashes()
+    backfill_town_keys()
+    backfill_heatmap()
+    logger.info("Database tables created")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    init_db()
@@ -0,0 +1,17 @@
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+
+_UNDECOMPOSABLE = str.maketrans({"ł": "l", "Ł": "L"})
+
+
+def normalize_text(value: str) -> str:
+    return _WHITESPACE.sub(" ", (value or "").casefold()).strip()
+
+
+def fold_diacritics(value: str) -> str:
+    decomposed = unicodedata.normalize(
+        "NFKD", (value or "").translate(_UNDECOMPOSABLE)
+    )
+    return "".join(c for c in decomposed if not unicodedata.combining(c))